@@ -8,3 +8,6 @@ class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.accounts'
     verbose_name = '用户管理'
+
+    def ready(self):
+        from . import signals  # noqa: F401
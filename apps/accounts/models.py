@@ -14,6 +14,10 @@ class UserRole(models.TextChoices):
     VISITOR = 'visitor', _('访客')
 
 
+# Roles counted as team members by User.is_team_member
+TEAM_MEMBER_ROLES = frozenset({UserRole.TEAM_ADMIN, UserRole.MEMBER, UserRole.SUPER_ADMIN})
+
+
 class User(AbstractUser):
     """
     Custom User model with team and role support.
@@ -62,7 +66,7 @@ class User(AbstractUser):
     @property
     def is_team_member(self):
         """Check if user is team member (admin or member)."""
-        return self.role in [UserRole.TEAM_ADMIN, UserRole.MEMBER, UserRole.SUPER_ADMIN]
+        return self.role in TEAM_MEMBER_ROLES
 
     @property
     def is_visitor(self):
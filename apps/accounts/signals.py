@@ -0,0 +1,21 @@
+"""
+Signal handlers for accounts app.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.cache import USERS_VERSION_KEY, bump_versions_on_commit
+from .models import User
+
+
+# User fields no cached or ETagged data depends on
+UNDISPLAYED_FIELDS = frozenset({'last_login', 'last_login_ip', 'password'})
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_users_version(sender, instance, update_fields=None, **kwargs):
+    """Invalidate cached data that shows users (names, avatars, team, active state)."""
+    if update_fields is not None and UNDISPLAYED_FIELDS.issuperset(update_fields):
+        return
+    bump_versions_on_commit(USERS_VERSION_KEY)
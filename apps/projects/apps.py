@@ -8,3 +8,6 @@ class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.projects'
     verbose_name = '项目管理'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -85,11 +85,11 @@ class Project(models.Model):
     @property
     def overdue_task_count(self):
         """Get overdue task count."""
-        from apps.tasks.models import Task
+        from apps.tasks.models import Task, ACTIVE_STATUSES
         return Task.objects.filter(
             project=self,
             normal_flag='overdue',
-            status__in=['planning', 'pending', 'in_progress']
+            status__in=ACTIVE_STATUSES
         ).count()
 
     @property
@@ -0,0 +1,27 @@
+"""
+Signal handlers for projects app.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.cache import (
+    PROJECTS_VERSION_KEY, MEMBERSHIPS_VERSION_KEY, project_members_version_key,
+    bump_versions_on_commit
+)
+from .models import Project, ProjectMember
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def bump_projects_version(sender, instance, **kwargs):
+    """Invalidate cached data that shows project titles or archive state."""
+    bump_versions_on_commit(PROJECTS_VERSION_KEY)
+
+
+@receiver(post_save, sender=ProjectMember)
+@receiver(post_delete, sender=ProjectMember)
+def bump_project_members_version(sender, instance, **kwargs):
+    """Invalidate the member's cached project IDs and cached member counts."""
+    bump_versions_on_commit(
+        project_members_version_key(instance.user_id), MEMBERSHIPS_VERSION_KEY
+    )
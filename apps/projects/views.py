@@ -244,7 +244,7 @@ class ProjectProgressView(generics.GenericAPIView):
     def get(self, request, *args, **kwargs):
         project = self.get_object()
         
-        from apps.tasks.models import Task
+        from apps.tasks.models import Task, ACTIVE_STATUSES
         from apps.accounts.models import User
         
         # Main task statistics
@@ -279,7 +279,7 @@ class ProjectProgressView(generics.GenericAPIView):
         for task in Task.objects.filter(
             project=project,
             normal_flag='overdue',
-            status__in=['planning', 'pending', 'in_progress']
+            status__in=ACTIVE_STATUSES
         ):
             overdue_tasks.append({
                 'id': task.id,
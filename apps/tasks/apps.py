@@ -8,3 +8,6 @@ class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.tasks'
     verbose_name = '任务管理'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,33 @@
+# Generated manually on 2026-10-15
+# Add an ngram FULLTEXT index on tasks(title, description) for task search.
+# MySQL only; other backends keep searching with icontains (config.search).
+
+from django.db import migrations
+
+
+def create_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    # Stopwords are bound to the index at creation time; with the ngram parser
+    # they would drop every token containing e.g. "a" or "to".
+    schema_editor.execute('SET SESSION innodb_ft_enable_stopword = OFF')
+    schema_editor.execute(
+        'CREATE FULLTEXT INDEX tasks_title_desc_ft ON tasks (title, description) WITH PARSER ngram'
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute('DROP INDEX tasks_title_desc_ft ON tasks')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_taskdeletelog'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated manually on 2026-10-15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskdeletelog',
+            index=models.Index(fields=['deleted_at'], name='task_delete_deleted_0bee18_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated manually on 2026-10-15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_taskdeletelog_deleted_at_index'),
+    ]
+
+    operations = [
+        # Add the replacement first: MySQL needs an index on project_id for the FK
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'level', 'status'], name='tasks_project_3b62a0_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_project_d892ca_idx',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'assignee'], name='tasks_project_d7b29e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'normal_flag'], name='tasks_project_231174_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated manually on 2026-10-15
+# Add an ngram FULLTEXT index on task_delete_logs(title) for deletion log search.
+# MySQL only; other backends keep searching with icontains (config.search).
+
+from django.db import migrations
+
+
+def create_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    # See 0005_task_fulltext_index for why stopwords are disabled
+    schema_editor.execute('SET SESSION innodb_ft_enable_stopword = OFF')
+    schema_editor.execute(
+        'CREATE FULLTEXT INDEX task_delete_logs_title_ft ON task_delete_logs (title) WITH PARSER ngram'
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute('DROP INDEX task_delete_logs_title_ft ON task_delete_logs')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_project_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,26 @@
+# Generated manually on 2026-10-15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_taskdeletelog_fulltext_index'),
+    ]
+
+    operations = [
+        # Add the replacement first: MySQL needs an index on assignee_id for the FK
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assignee', 'status', 'end_date'], name='tasks_assigne_20502d_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_assigne_972e70_idx',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assignee', 'normal_flag', 'status'], name='tasks_assigne_29c0ad_idx'),
+        ),
+    ]
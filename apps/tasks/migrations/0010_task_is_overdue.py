@@ -0,0 +1,24 @@
+# Generated manually on 2026-10-15
+
+from django.db import migrations, models
+
+
+def fill_is_overdue(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.filter(normal_flag='overdue').update(is_overdue=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_task_assignee_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='is_overdue',
+            field=models.BooleanField(db_index=True, default=False, verbose_name='是否逾期'),
+        ),
+        migrations.RunPython(fill_is_overdue, migrations.RunPython.noop),
+    ]
@@ -3,7 +3,9 @@ Tasks models for TeamSync.
 """
 from django.db import models
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Q
+from django.db.models import Q, Count, OuterRef, Subquery, Case, When, Value
+from django.db.models.lookups import Exact
+from django.db.models.functions import Coalesce
 
 
 class TaskStatus(models.TextChoices):
@@ -14,6 +16,13 @@ class TaskStatus(models.TextChoices):
     COMPLETED = 'completed', _('已完成')
 
 
+# Statuses of tasks that still count as open work
+ACTIVE_STATUSES = [TaskStatus.PLANNING, TaskStatus.PENDING, TaskStatus.IN_PROGRESS]
+
+# Deepest task level; main tasks are level 1
+MAX_TASK_LEVEL = 3
+
+
 class TaskPriority(models.TextChoices):
     """Task priority choices."""
     URGENT = 'urgent', _('紧急')
@@ -28,6 +37,39 @@ class OverdueFlag(models.TextChoices):
     OVERDUE = 'overdue', _('已逾期')
 
 
+def _is_overdue_value(normal_flag):
+    """Get the is_overdue value matching a normal_flag value or expression."""
+    if hasattr(normal_flag, 'resolve_expression'):
+        return Case(
+            When(Exact(normal_flag, OverdueFlag.OVERDUE), then=Value(True)),
+            default=Value(False)
+        )
+    return normal_flag == OverdueFlag.OVERDUE
+
+
+class TaskQuerySet(models.QuerySet):
+    """Task queryset whose bulk writes keep is_overdue in sync with normal_flag."""
+
+    def update(self, **kwargs):
+        """Update rows, also writing is_overdue when normal_flag is written."""
+        if 'normal_flag' in kwargs and 'is_overdue' not in kwargs:
+            kwargs['is_overdue'] = _is_overdue_value(kwargs['normal_flag'])
+        return super().update(**kwargs)
+
+    update.alters_data = True
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        """Bulk update objs, also writing is_overdue when normal_flag is written."""
+        if 'normal_flag' in fields and 'is_overdue' not in fields:
+            objs = list(objs)
+            for obj in objs:
+                obj.is_overdue = _is_overdue_value(obj.normal_flag)
+            fields = [*fields, 'is_overdue']
+        return super().bulk_update(objs, fields, batch_size=batch_size)
+
+    bulk_update.alters_data = True
+
+
 class Task(models.Model):
     """
     Task model with hierarchical structure (max 3 levels).
@@ -91,6 +133,9 @@ class Task(models.Model):
         choices=OverdueFlag.choices,
         default=OverdueFlag.NORMAL
     )
+    # Mirrors normal_flag == 'overdue', kept in sync by save() and by
+    # TaskQuerySet.update() / bulk_update()
+    is_overdue = models.BooleanField(_('是否逾期'), default=False, db_index=True)
     is_overdue_notified = models.BooleanField(_('已发送逾期提醒'), default=False)
     is_due_notified = models.BooleanField(_('已发送截止提醒'), default=False)
     # Metadata
@@ -105,14 +150,19 @@ class Task(models.Model):
         verbose_name=_('创建者')
     )
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         db_table = 'tasks'
         verbose_name = _('任务')
         verbose_name_plural = _('任务')
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['project', 'level']),
-            models.Index(fields=['assignee', 'status']),
+            models.Index(fields=['project', 'level', 'status']),
+            models.Index(fields=['project', 'assignee']),
+            models.Index(fields=['project', 'normal_flag']),
+            models.Index(fields=['assignee', 'status', 'end_date']),
+            models.Index(fields=['assignee', 'normal_flag', 'status']),
             models.Index(fields=['status']),
             models.Index(fields=['end_date']),
             models.Index(fields=['normal_flag']),
@@ -128,25 +178,46 @@ class Task(models.Model):
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Load a task, remembering its stored assignee.
+
+        The save signal compares against it to invalidate the previous
+        assignee's cached data without querying for it.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_assignee_id = instance.__dict__.get('assignee_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Save the task, deriving is_overdue from normal_flag."""
+        if 'normal_flag' not in self.get_deferred_fields():
+            self.is_overdue = self.normal_flag == OverdueFlag.OVERDUE
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'normal_flag' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'is_overdue'}
+        super().save(*args, **kwargs)
+
     @property
     def subtask_count(self):
-        """Get subtask count."""
-        return self.children.count()
+        """Get subtask count (annotated by annotate_subtask_counts())."""
+        count = getattr(self, 'subtask_count_ann', None)
+        if count is None:
+            count = self.children.count()
+        return count
 
     @property
     def completed_subtask_count(self):
-        """Get completed subtask count."""
-        return self.children.filter(status='completed').count()
-
-    @property
-    def is_overdue(self):
-        """Check if task is overdue."""
-        return self.normal_flag == OverdueFlag.OVERDUE
+        """Get completed subtask count (annotated by annotate_subtask_counts())."""
+        count = getattr(self, 'completed_subtask_count_ann', None)
+        if count is None:
+            count = self.children.filter(status='completed').count()
+        return count
 
     @property
     def can_have_subtasks(self):
         """Check if task can have subtasks."""
-        return self.level < 3
+        return self.level < MAX_TASK_LEVEL
 
     @property
     def full_path(self):
@@ -175,25 +246,48 @@ class Task(models.Model):
         kwargs['level'] = self.level + 1
         kwargs['parent'] = self
         kwargs['path'] = self.full_path
-        kwargs['assignee'] = self.assignee  # Inherit assignee
+        kwargs['assignee_id'] = self.assignee_id  # Inherit assignee
         
         return Task.objects.create(**kwargs)
 
     def update_status(self, new_status, changed_by=None):
-        """Update task status and record history."""
+        """Update task status and record history.
+        
+        The change is a single conditional UPDATE, so concurrent requests
+        setting the same status record only one history entry.
+        """
+        from django.utils import timezone
+        
         old_status = self.status
-        if old_status != new_status:
-            self.status = new_status
-            self.save(update_fields=['status', 'updated_at'])
-            
-            # Record history
-            TaskHistory.objects.create(
-                task=self,
-                changed_by=changed_by,
-                field_name='status',
-                old_value=old_status,
-                new_value=new_status
-            )
+        if old_status == new_status:
+            return
+        
+        now = timezone.now()
+        updated = Task.objects.filter(pk=self.pk).exclude(status=new_status).update(
+            status=new_status, updated_at=now
+        )
+        self.status = new_status
+        if not updated:
+            return
+        self.updated_at = now
+        
+        # update() skips post_save, so invalidate cached data here
+        from config.cache import (
+            assignee_version_key, project_tasks_version_key, bump_versions_on_commit
+        )
+        keys = [project_tasks_version_key(self.project_id)]
+        if self.assignee_id:
+            keys.append(assignee_version_key(self.assignee_id))
+        bump_versions_on_commit(*keys)
+        
+        # Record history
+        TaskHistory.objects.create(
+            task=self,
+            changed_by=changed_by,
+            field_name='status',
+            old_value=old_status,
+            new_value=new_status
+        )
 
     def check_overdue(self):
         """Check and update overdue status."""
@@ -246,6 +340,29 @@ class Task(models.Model):
         return data
 
 
+def annotate_subtask_counts(queryset):
+    """Annotate each task's subtask counts so listing tasks needs no per-task query.
+
+    Args:
+        queryset: Task queryset
+
+    Returns:
+        Queryset annotated with subtask_count_ann and
+        completed_subtask_count_ann, read by the Task count properties
+    """
+    children = Task.objects.filter(parent=OuterRef('pk')).order_by()
+    return queryset.annotate(
+        subtask_count_ann=Coalesce(Subquery(
+            children.values('parent').annotate(count=Count('id')).values('count')
+        ), 0),
+        completed_subtask_count_ann=Coalesce(Subquery(
+            children.filter(status='completed').values('parent').annotate(
+                count=Count('id')
+            ).values('count')
+        ), 0)
+    )
+
+
 class TaskHistory(models.Model):
     """
     Task change history for audit.
@@ -363,6 +480,7 @@ class TaskDeleteLog(models.Model):
         indexes = [
             models.Index(fields=['project_id', 'deleted_at']),
             models.Index(fields=['deleted_by', 'deleted_at']),
+            models.Index(fields=['deleted_at']),
         ]
 
     def __str__(self):
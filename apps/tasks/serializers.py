@@ -2,7 +2,8 @@
 Tasks serializers for TeamSync.
 """
 from rest_framework import serializers
-from .models import Task, TaskHistory, TaskAttachment, TaskStatus, TaskPriority
+from config.permissions import is_privileged, can_access_task
+from .models import Task, TaskHistory, TaskAttachment, TaskStatus, TaskPriority, MAX_TASK_LEVEL
 
 
 class TaskAttachmentSerializer(serializers.ModelSerializer):
@@ -15,7 +16,7 @@ class TaskAttachmentSerializer(serializers.ModelSerializer):
             'id', 'file_name', 'file_type', 'file_size',
             'url', 'uploaded_by', 'uploaded_by_name', 'created_at'
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = fields
 
 
 class TaskHistorySerializer(serializers.ModelSerializer):
@@ -28,7 +29,14 @@ class TaskHistorySerializer(serializers.ModelSerializer):
             'id', 'field_name', 'old_value', 'new_value',
             'changed_by', 'changed_by_name', 'changed_at'
         ]
-        read_only_fields = ['id', 'changed_at']
+        read_only_fields = fields
+
+
+def include_requested(request, name):
+    """Check if an optional field is requested via ?include=a,b."""
+    if request is None:
+        return False
+    return name in request.query_params.get('include', '').split(',')
 
 
 class TaskListSerializer(serializers.ModelSerializer):
@@ -49,7 +57,7 @@ class TaskListSerializer(serializers.ModelSerializer):
             'subtask_count', 'completed_subtask_count',
             'can_view', 'can_edit', 'created_at'
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = fields
 
     def get_assignee(self, obj):
         """Get assignee info with full avatar URL."""
@@ -79,29 +87,19 @@ class TaskListSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request:
             return False
-        user = request.user
-        return (
-            user.is_super_admin or
-            user.is_team_admin or
-            obj.assignee_id == user.id
-        )
+        return can_access_task(request, obj)
     
     def get_can_edit(self, obj):
         """Check if user can edit task."""
         request = self.context.get('request')
         if not request:
             return False
-        user = request.user
         
         # Check if project is archived
         if obj.project.is_archived:
             return False
         
-        return (
-            user.is_super_admin or
-            user.is_team_admin or
-            obj.assignee_id == user.id
-        )
+        return can_access_task(request, obj)
 
 
 class TaskTreeSerializer(serializers.ModelSerializer):
@@ -121,7 +119,7 @@ class TaskTreeSerializer(serializers.ModelSerializer):
             'normal_flag', 'subtask_count', 'completed_subtask_count',
             'children', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = fields
 
     def get_assignee(self, obj):
         """Get assignee info with full avatar URL."""
@@ -146,28 +144,64 @@ class TaskTreeSerializer(serializers.ModelSerializer):
     
     def get_children(self, obj):
         """Get child tasks."""
-        if obj.level >= 3:
+        if obj.level >= MAX_TASK_LEVEL:
+            return []
+        
+        # Children are attached afterwards by serialize_task_tree()
+        if 'children_map' in self.context:
             return []
         
         # Filter by permission
         request = self.context.get('request')
-        user = request.user if request else None
         
         children = obj.children.all()
         
         # For members, only show their own subtasks
-        if user and not (user.is_super_admin or user.is_team_admin):
-            children = children.filter(assignee=user)
+        if request and not is_privileged(request):
+            children = children.filter(assignee=request.user)
         
         return TaskTreeSerializer(children, many=True, context=self.context).data
 
 
+def serialize_task_tree(roots, children_map, context):
+    """Serialize task trees in a single TaskTreeSerializer pass.
+
+    Args:
+        roots: Top-level tasks, in output order
+        children_map: Task id -> list of visible child tasks
+        context: Serializer context
+
+    Returns:
+        List of root task dicts with nested children
+    """
+    nodes = []
+    pending = list(roots)
+    while pending:
+        task = pending.pop()
+        nodes.append(task)
+        if task.level < MAX_TASK_LEVEL:
+            pending.extend(children_map.get(task.id, ()))
+    
+    data = TaskTreeSerializer(
+        nodes, many=True, context={**context, 'children_map': children_map}
+    ).data
+    data_by_id = {item['id']: item for item in data}
+    
+    for task in nodes:
+        if task.level < MAX_TASK_LEVEL:
+            data_by_id[task.id]['children'] = [
+                data_by_id[child.id] for child in children_map.get(task.id, ())
+            ]
+    
+    return [data_by_id[task.id] for task in roots]
+
+
 class TaskDetailSerializer(serializers.ModelSerializer):
     """Task detail serializer."""
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     priority_display = serializers.CharField(source='get_priority_display', read_only=True)
     assignee = serializers.SerializerMethodField()
-    attachments = TaskAttachmentSerializer(many=True, read_only=True)
+    attachments = serializers.SerializerMethodField()
     subtask_count = serializers.IntegerField(read_only=True)
     can_view = serializers.SerializerMethodField()
     can_edit = serializers.SerializerMethodField()
@@ -184,7 +218,7 @@ class TaskDetailSerializer(serializers.ModelSerializer):
             'can_view', 'can_edit',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = fields
     
     def get_assignee(self, obj):
         """Get assignee info with full avatar URL."""
@@ -195,6 +229,12 @@ class TaskDetailSerializer(serializers.ModelSerializer):
                 'avatar': self._get_full_avatar_url(obj.assignee.avatar)
             }
         return None
+    
+    def get_attachments(self, obj):
+        """Get attachments, only when requested with ?include=attachments."""
+        if not include_requested(self.context.get('request'), 'attachments'):
+            return []
+        return TaskAttachmentSerializer(obj.attachments.all(), many=True).data
 
     def _get_full_avatar_url(self, avatar):
         """Build full avatar URL."""
@@ -212,29 +252,31 @@ class TaskDetailSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request:
             return False
-        user = request.user
-        return (
-            user.is_super_admin or
-            user.is_team_admin or
-            obj.assignee_id == user.id
-        )
+        return can_access_task(request, obj)
     
     def get_can_edit(self, obj):
         """Check if user can edit task."""
         request = self.context.get('request')
         if not request:
             return False
-        user = request.user
         
         # Check if project is archived
         if obj.project.is_archived:
             return False
         
-        return (
-            user.is_super_admin or
-            user.is_team_admin or
-            obj.assignee_id == user.id
-        )
+        return can_access_task(request, obj)
+
+
+# Output of MaskedTaskSerializer; id, title and level are filled per task
+_MASKED_TASK_TEMPLATE = {
+    'id': None,
+    'title': None,
+    'status': 'private',
+    'level': None,
+    'assignee': '🔒 私有任务',
+    'can_view': False,
+    'message': '该任务未分配给您，无权查看详情'
+}
 
 
 class MaskedTaskSerializer(serializers.ModelSerializer):
@@ -245,18 +287,15 @@ class MaskedTaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
         fields = ['id', 'title', 'status', 'level', 'can_view', 'message']
+        read_only_fields = fields
     
     def to_representation(self, instance):
         """Override to mask sensitive data."""
-        return {
-            'id': instance.id,
-            'title': instance.title,
-            'status': 'private',
-            'level': instance.level,
-            'assignee': '🔒 私有任务',
-            'can_view': False,
-            'message': '该任务未分配给您，无权查看详情'
-        }
+        data = _MASKED_TASK_TEMPLATE.copy()
+        data['id'] = instance.id
+        data['title'] = instance.title
+        data['level'] = instance.level
+        return data
 
 
 class TaskCreateSerializer(serializers.ModelSerializer):
@@ -275,26 +314,23 @@ class TaskCreateSerializer(serializers.ModelSerializer):
     def validate_assignee_id(self, value):
         """Validate assignee is a team member."""
         from apps.accounts.models import User
-        from apps.projects.models import Project
+        from apps.projects.models import ProjectMember
         
-        project_id = self.context.get('project_id')
+        # The view has already loaded the project; fall back to its id
+        project = self.context.get('project')
+        project_id = project.id if project else self.context.get('project_id')
         if not project_id:
             raise serializers.ValidationError('项目ID不能为空')
         
-        try:
-            project = Project.objects.get(id=project_id)
-        except Project.DoesNotExist:
-            raise serializers.ValidationError('项目不存在')
+        # One membership lookup covers the common (valid) case
+        if ProjectMember.objects.filter(
+            project_id=project_id, user_id=value, user__is_active=True
+        ).exists():
+            return value
         
-        try:
-            user = User.objects.get(id=value)
-        except User.DoesNotExist:
+        if not User.objects.filter(id=value).exists():
             raise serializers.ValidationError('负责人不存在')
-        
-        if not project.has_member(user):
-            raise serializers.ValidationError('负责人不是项目成员')
-        
-        return value
+        raise serializers.ValidationError('负责人不是项目成员')
 
 
 class SubtaskCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,31 @@
+"""
+Signal handlers for tasks app.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.cache import assignee_version_key, project_tasks_version_key, bump_versions_on_commit
+from .models import Task
+
+
+@receiver(post_save, sender=Task)
+def bump_versions_on_task_save(sender, instance, **kwargs):
+    """Invalidate cached data of the task's project and current and previous assignee.
+
+    The previous assignee is the one the task was loaded with (see
+    Task.from_db()); it is then reset so later saves compare against this one.
+    """
+    assignee_ids = {instance.assignee_id, getattr(instance, '_loaded_assignee_id', None)}
+    instance._loaded_assignee_id = instance.assignee_id
+    bump_versions_on_commit(project_tasks_version_key(instance.project_id), *(
+        assignee_version_key(user_id) for user_id in assignee_ids if user_id
+    ))
+
+
+@receiver(post_delete, sender=Task)
+def bump_versions_on_task_delete(sender, instance, **kwargs):
+    """Invalidate cached data of the deleted task's project and assignee."""
+    keys = [project_tasks_version_key(instance.project_id)]
+    if instance.assignee_id:
+        keys.append(assignee_version_key(instance.assignee_id))
+    bump_versions_on_commit(*keys)
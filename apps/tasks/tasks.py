@@ -12,7 +12,7 @@ def check_overdue_tasks():
     Check and mark overdue tasks.
     Run daily at 00:01.
     """
-    from .models import Task, OverdueFlag
+    from .models import Task, OverdueFlag, ACTIVE_STATUSES
     from apps.notifications.models import Notification
     from apps.notifications.services import NotificationService
     
@@ -21,7 +21,7 @@ def check_overdue_tasks():
     # Find tasks that are overdue
     overdue_tasks = Task.objects.filter(
         end_date__lt=today,
-        status__in=['planning', 'pending', 'in_progress'],
+        status__in=ACTIVE_STATUSES,
         normal_flag=OverdueFlag.NORMAL
     )
     
@@ -45,7 +45,7 @@ def send_due_reminders():
     Send due date reminders.
     Run daily at 07:00.
     """
-    from .models import Task
+    from .models import Task, ACTIVE_STATUSES
     from apps.notifications.services import NotificationService
     
     today = timezone.now().date()
@@ -53,7 +53,7 @@ def send_due_reminders():
     # Find tasks due today
     due_tasks = Task.objects.filter(
         end_date=today,
-        status__in=['planning', 'pending', 'in_progress'],
+        status__in=ACTIVE_STATUSES,
         is_due_notified=False
     )
     
@@ -0,0 +1,411 @@
+"""
+Tests for tasks app.
+"""
+from datetime import time, timedelta
+from unittest import mock
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.db.models import Case, Value, When
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.test import TestCase
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from apps.accounts.models import Team
+from apps.projects.models import Project
+from apps.tasks.models import Task, TaskAttachment, TaskHistory, OverdueFlag
+from apps.tasks.tasks import check_overdue_tasks
+from config.search import search_filter
+
+User = get_user_model()
+
+
+class ProjectTaskTreeAPITests(APITestCase):
+    """Tests for the project task tree view."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.team = Team.objects.create(name='Test Team')
+        self.admin = User.objects.create_user(
+            username='admin',
+            email='admin@example.com',
+            password='admin123',
+            role='team_admin',
+            team=self.team
+        )
+        self.member = User.objects.create_user(
+            username='member',
+            email='member@example.com',
+            password='member123',
+            role='member',
+            team=self.team
+        )
+        self.project = Project.objects.create(title='Project', team=self.team)
+        self.project.add_member(self.admin)
+        self.project.add_member(self.member)
+        
+        self.task = Task.objects.create(
+            project=self.project, title='main', assignee=self.member
+        )
+        self.subtask = self.task.create_subtask(title='sub')
+        self.grandchild = self.subtask.create_subtask(title='grandchild')
+        self.other_subtask = self.task.create_subtask(title='other')
+        self.other_subtask.assignee = self.admin
+        self.other_subtask.save()
+        self.url = f'/api/tasks/project/{self.project.id}/?view=tree'
+    
+    def test_tree_as_admin(self):
+        """Test admin sees every subtask nested under its parent."""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        items = response.data['data']['items']
+        self.assertEqual([item['id'] for item in items], [self.task.id])
+        children = items[0]['children']
+        self.assertEqual(
+            [child['id'] for child in children],
+            [self.other_subtask.id, self.subtask.id]
+        )
+        self.assertEqual(children[1]['children'][0]['id'], self.grandchild.id)
+        self.assertEqual(children[1]['children'][0]['children'], [])
+    
+    def test_tree_as_member(self):
+        """Test member only sees their own subtasks."""
+        self.client.force_authenticate(user=self.member)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        children = response.data['data']['items'][0]['children']
+        self.assertEqual([child['id'] for child in children], [self.subtask.id])
+        self.assertEqual(children[0]['children'][0]['id'], self.grandchild.id)
+    
+    def test_tree_subtask_counts(self):
+        """Test subtask counts include subtasks the member cannot see."""
+        self.other_subtask.status = 'completed'
+        self.other_subtask.save()
+        self.client.force_authenticate(user=self.member)
+        response = self.client.get(self.url)
+        
+        item = response.data['data']['items'][0]
+        self.assertEqual(item['subtask_count'], 2)
+        self.assertEqual(item['completed_subtask_count'], 1)
+        self.assertEqual(item['children'][0]['subtask_count'], 1)
+    
+    def test_tree_not_modified(self):
+        """Test tree is answered with 304 until a task changes."""
+        self.client.force_authenticate(user=self.admin)
+        etag = self.client.get(self.url)['ETag']
+        
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.subtask.title = 'renamed'
+            self.subtask.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_tree_modified_by_assignee_change(self):
+        """Test a new assignee avatar changes the tree ETag."""
+        self.client.force_authenticate(user=self.admin)
+        etag = self.client.get(self.url)['ETag']
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.avatar = 'https://example.com/new.png'
+            self.member.save(update_fields=['avatar'])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data['data']['items'][0]['assignee']['avatar'],
+            'https://example.com/new.png'
+        )
+
+
+class TaskDetailAPITests(APITestCase):
+    """Tests for the task detail view."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.team = Team.objects.create(name='Test Team')
+        self.member = User.objects.create_user(
+            username='member',
+            email='member@example.com',
+            password='member123',
+            role='member',
+            team=self.team
+        )
+        self.project = Project.objects.create(title='Project', team=self.team)
+        self.project.add_member(self.member)
+        self.task = Task.objects.create(
+            project=self.project, title='main', assignee=self.member
+        )
+        TaskAttachment.objects.create(
+            task=self.task,
+            file_key='tasks/1/a.txt',
+            file_name='a.txt',
+            file_type='text/plain',
+            file_size=1,
+            url='https://example.com/a.txt',
+            uploaded_by=self.member
+        )
+        self.url = f'/api/tasks/{self.task.id}/'
+        self.client.force_authenticate(user=self.member)
+    
+    def test_attachments_omitted_by_default(self):
+        """Test attachments are not serialized unless requested."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['attachments'], [])
+    
+    def test_attachments_included(self):
+        """Test ?include=attachments returns the attachment list."""
+        response = self.client.get(self.url, {'include': 'attachments'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        attachments = response.data['data']['attachments']
+        self.assertEqual([a['file_name'] for a in attachments], ['a.txt'])
+        self.assertEqual(attachments[0]['uploaded_by_name'], 'member')
+
+
+class TaskClaimAPITests(APITestCase):
+    """Tests for the task claim view."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.team = Team.objects.create(name='Test Team')
+        self.member = User.objects.create_user(
+            username='member',
+            email='member@example.com',
+            password='member123',
+            role='member',
+            team=self.team
+        )
+        self.project = Project.objects.create(title='Project', team=self.team)
+        self.project.add_member(self.member)
+        self.task = Task.objects.create(project=self.project, title='main')
+        self.url = f'/api/tasks/{self.task.id}/claim/'
+        self.client.force_authenticate(user=self.member)
+    
+    def _claim(self, end_date):
+        """Claim the task and return its stored local end date."""
+        response = self.client.post(
+            self.url, {'status': 'pending', 'end_date': end_date}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.assignee_id, self.member.id)
+        return timezone.localtime(self.task.end_date)
+    
+    def test_claim_extended_date(self):
+        """Test a YYYY-MM-DD end date is due at the end of that day."""
+        end_date = self._claim('2099-10-15')
+        self.assertEqual(end_date.date().isoformat(), '2099-10-15')
+        self.assertEqual(end_date.time(), time(23, 59, 59))
+    
+    def test_claim_basic_date(self):
+        """Test a YYYYMMDD end date is due at the end of that day too."""
+        end_date = self._claim('20991015')
+        self.assertEqual(end_date.date().isoformat(), '2099-10-15')
+        self.assertEqual(end_date.time(), time(23, 59, 59))
+    
+    def test_claim_datetime(self):
+        """Test an end date with a time keeps that time."""
+        end_date = self._claim('2099-10-15T18:30:00')
+        self.assertEqual(end_date.time(), time(18, 30))
+
+
+class TaskUpdateTests(APITestCase):
+    """Tests for task status changes and partial updates."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.team = Team.objects.create(name='Test Team')
+        self.member = User.objects.create_user(
+            username='member',
+            email='member@example.com',
+            password='member123',
+            role='member',
+            team=self.team
+        )
+        self.project = Project.objects.create(title='Project', team=self.team)
+        self.project.add_member(self.member)
+        self.task = Task.objects.create(
+            project=self.project, title='main', description='text',
+            status='pending', assignee=self.member
+        )
+        self.client.force_authenticate(user=self.member)
+    
+    def test_update_status_unchanged(self):
+        """Test setting the current status writes nothing."""
+        updated_at = self.task.updated_at
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.task.update_status('pending', changed_by=self.member)
+        
+        self.assertEqual(callbacks, [])
+        self.assertFalse(TaskHistory.objects.filter(task=self.task).exists())
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.updated_at, updated_at)
+    
+    def test_update_status_changed(self):
+        """Test a new status is saved with one history row."""
+        updated_at = self.task.updated_at
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.task.update_status('in_progress', changed_by=self.member)
+        
+        self.assertEqual(len(callbacks), 1)
+        history = TaskHistory.objects.get(task=self.task)
+        self.assertEqual(
+            (history.field_name, history.old_value, history.new_value),
+            ('status', 'pending', 'in_progress')
+        )
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'in_progress')
+        self.assertGreater(self.task.updated_at, updated_at)
+        
+        # A stale instance setting the same status records nothing more
+        stale = Task.objects.get(pk=self.task.pk)
+        stale.status = 'pending'
+        stale.update_status('in_progress', changed_by=self.member)
+        self.assertEqual(TaskHistory.objects.filter(task=self.task).count(), 1)
+    
+    def test_partial_update_writes_submitted_fields(self):
+        """Test a partial update only writes the submitted columns."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                f'/api/tasks/{self.task.id}/update/', {'title': 'renamed'}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        updates = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith(f"UPDATE {connection.ops.quote_name('tasks')}")
+        ]
+        self.assertEqual(len(updates), 1)
+        set_clause = updates[0].split(' WHERE ')[0]
+        self.assertEqual(
+            set(re.findall(r'["`](\w+)["`] = ', set_clause)), {'title', 'updated_at'}
+        )
+        
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.title, self.task.description), ('renamed', 'text'))
+        self.assertEqual(
+            list(TaskHistory.objects.filter(task=self.task).values_list('field_name', flat=True)),
+            ['title']
+        )
+
+
+class OverdueFlagSyncTests(TestCase):
+    """Tests that is_overdue follows normal_flag on every write path."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.team = Team.objects.create(name='Test Team')
+        self.member = User.objects.create_user(
+            username='member',
+            email='member@example.com',
+            password='member123',
+            role='member',
+            team=self.team
+        )
+        self.project = Project.objects.create(title='Project', team=self.team)
+        self.task = Task.objects.create(
+            project=self.project, title='main', status='pending', assignee=self.member,
+            end_date=timezone.now() - timedelta(days=2)
+        )
+    
+    def assert_overdue(self):
+        """Assert the stored task is flagged overdue in both columns."""
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.normal_flag, OverdueFlag.OVERDUE)
+        self.assertTrue(self.task.is_overdue)
+    
+    def test_check_overdue_tasks(self):
+        """Test the periodic overdue job sets is_overdue."""
+        check_overdue_tasks()
+        self.assert_overdue()
+    
+    def test_check_overdue(self):
+        """Test Task.check_overdue() sets is_overdue."""
+        self.assertTrue(self.task.check_overdue())
+        self.assert_overdue()
+    
+    def test_queryset_update(self):
+        """Test QuerySet.update() writing normal_flag also writes is_overdue."""
+        Task.objects.filter(pk=self.task.pk).update(normal_flag=OverdueFlag.OVERDUE)
+        self.assert_overdue()
+        
+        Task.objects.filter(pk=self.task.pk).update(normal_flag=OverdueFlag.NORMAL)
+        self.task.refresh_from_db()
+        self.assertFalse(self.task.is_overdue)
+    
+    def test_queryset_update_expression(self):
+        """Test an expression written to normal_flag is mirrored too."""
+        Task.objects.filter(pk=self.task.pk).update(
+            normal_flag=Case(
+                When(end_date__lt=timezone.now(), then=Value(OverdueFlag.OVERDUE)),
+                default=Value(OverdueFlag.NORMAL)
+            )
+        )
+        self.assert_overdue()
+    
+    def test_bulk_update(self):
+        """Test bulk_update() of normal_flag also writes is_overdue."""
+        self.task.normal_flag = OverdueFlag.OVERDUE
+        Task.objects.bulk_update([self.task], ['normal_flag'])
+        self.assert_overdue()
+
+
+class SearchFilterTests(TestCase):
+    """Tests for the task search filter on MySQL and other backends."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.team = Team.objects.create(name='Test Team')
+        self.project = Project.objects.create(title='Project', team=self.team)
+        for title in ('C++ build', 'report', 'a "quoted" title'):
+            Task.objects.create(project=self.project, title=title)
+    
+    def search(self, term):
+        """Search task titles and descriptions for term."""
+        return search_filter(Task.objects.all(), ('title', 'description'), term)
+    
+    def titles(self, term):
+        """Get the titles of the tasks found for term."""
+        return list(self.search(term).order_by('title').values_list('title', flat=True))
+    
+    def search_on_mysql(self, term):
+        """Build the search query as the MySQL backend would and return its SQL and params."""
+        with mock.patch.object(connections[Task.objects.db], 'vendor', 'mysql'):
+            queryset = self.search(term)
+        return queryset.query.sql_with_params()
+    
+    def test_icontains(self):
+        """Test other backends match the raw term as a substring."""
+        self.assertEqual(self.titles('C++'), ['C++ build'])
+        self.assertEqual(self.titles('"quoted"'), ['a "quoted" title'])
+        self.assertEqual(self.titles('r'), ['report'])
+    
+    def test_mysql_match_against(self):
+        """Test MySQL searches the term as a quoted boolean-mode phrase."""
+        sql, params = self.search_on_mysql('report')
+        self.assertIn('MATCH (', sql)
+        self.assertIn('IN BOOLEAN MODE', sql)
+        self.assertIn('"report"', params)
+    
+    def test_mysql_strips_boolean_operators(self):
+        """Test boolean-mode operators and quotes never reach AGAINST."""
+        sql, params = self.search_on_mysql('+build -"re*port" ~<>')
+        self.assertIn('MATCH (', sql)
+        self.assertIn('"build re port"', params)
+    
+    def test_mysql_short_terms_use_icontains(self):
+        """Test words shorter than the ngram size fall back to icontains."""
+        for term in ('r', '"r"', '+', 'C++'):
+            sql, params = self.search_on_mysql(term)
+            self.assertNotIn('MATCH (', sql)
+            self.assertIn(f'%{term}%', params)
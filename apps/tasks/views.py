@@ -1,23 +1,42 @@
 """
 Tasks views for TeamSync.
 """
-from rest_framework import generics, status, permissions
+from rest_framework import generics, status, permissions, serializers
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Q
 from django.utils import timezone
-
-from .models import Task, TaskHistory, TaskAttachment, TaskDeleteLog
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Prefetch
+from django.http import HttpResponseNotModified
+from django.db.models.fields.json import KeyTransform
+from collections import defaultdict
+import re
+
+from .models import (
+    Task, TaskHistory, TaskAttachment, TaskDeleteLog, TaskStatus, MAX_TASK_LEVEL,
+    annotate_subtask_counts
+)
 from .serializers import (
-    TaskListSerializer, TaskTreeSerializer, TaskDetailSerializer,
+    TaskListSerializer, TaskDetailSerializer,
     MaskedTaskSerializer, TaskCreateSerializer, SubtaskCreateSerializer,
     TaskUpdateSerializer, TaskStatusUpdateSerializer, TaskHistorySerializer,
-    TaskProgressSerializer
+    TaskProgressSerializer, serialize_task_tree, include_requested
 )
 from config.permissions import (
-    IsAdminOrSuperAdmin, IsTeamMember, IsTaskAssigneeOrAdmin
+    IsAdminOrSuperAdmin, IsTeamMember, IsTaskAssigneeOrAdmin,
+    is_privileged, can_access_task
 )
 from config.exceptions import ValidationError, ResourceNotFound, PermissionDenied
+from config.search import search_filter
+from config.etag import make_etag, etag_matches
+from config.cache import USERS_VERSION_KEY, project_tasks_version_key, get_versions
+
+
+_VALID_STATUSES = frozenset(TaskStatus.values)
+_LEVEL_RE = re.compile(r'^[1-3]$')
+
+# Formats datetimes exactly like the serializers' DateTimeField
+_datetime_field = serializers.DateTimeField()
 
 
 def get_full_avatar_url(request, avatar):
@@ -41,24 +60,53 @@ def get_full_avatar_url(request, avatar):
     return avatar
 
 
+def get_project_for_user(project_id, user):
+    """Fetch a project with the fields task views use and the user's membership.
+
+    Args:
+        project_id: Project ID
+        user: User to check membership for (annotated as ``is_member``)
+
+    Returns:
+        Project instance
+
+    Raises:
+        Project.DoesNotExist: If the project does not exist
+    """
+    from apps.projects.models import Project, ProjectMember
+    
+    return Project.objects.only('id', 'is_archived', 'title').annotate(
+        is_member=Exists(ProjectMember.objects.filter(
+            project=OuterRef('pk'), user_id=user.id, user__is_active=True
+        ))
+    ).get(id=project_id)
+
+
 class ProjectTaskListView(generics.ListAPIView):
     """List tasks in a project."""
     serializer_class = TaskListSerializer
     permission_classes = [IsTeamMember]
+    # Columns read by TaskListSerializer and MaskedTaskSerializer
+    flat_view_fields = (
+        'id', 'title', 'status', 'priority', 'level',
+        'start_date', 'end_date', 'normal_flag', 'created_at',
+        'assignee', 'assignee__username', 'assignee__avatar',
+        'project', 'project__is_archived',
+    )
     
     def get_queryset(self):
         from apps.projects.models import Project
         project_id = self.kwargs.get('project_id')
+        user = self.request.user
         
         try:
-            project = Project.objects.get(id=project_id)
+            project = get_project_for_user(project_id, user)
         except Project.DoesNotExist:
             return Task.objects.none()
-        
-        user = self.request.user
+        self.project = project
         
         # Check permission
-        if not (user.is_super_admin or user.is_team_admin or project.has_member(user)):
+        if not (is_privileged(self.request) or project.is_member):
             return Task.objects.none()
         
         queryset = Task.objects.filter(project=project)
@@ -82,81 +130,135 @@ class ProjectTaskListView(generics.ListAPIView):
         # Filter by status
         status_filter = self.request.query_params.get('status')
         if status_filter:
-            statuses = status_filter.split(',')
+            # Unknown statuses match nothing, so drop them before querying
+            statuses = [s for s in status_filter.split(',') if s in _VALID_STATUSES]
             queryset = queryset.filter(status__in=statuses)
         
         # Filter by level
         level = self.request.query_params.get('level')
         if level:
-            queryset = queryset.filter(level=int(level))
+            if _LEVEL_RE.match(level):
+                queryset = queryset.filter(level=int(level))
+            else:
+                queryset = queryset.none()
         
         # Search
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search)
-            )
+            queryset = search_filter(queryset, ('title', 'description'), search)
         
-        return queryset.select_related('assignee', 'project')
+        return annotate_subtask_counts(queryset.select_related('assignee', 'project'))
     
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
         view_type = request.query_params.get('view', 'flat')
-        user = request.user
+        context = {'request': request}
         
         if view_type == 'tree':
+            # Tree view - skip rebuilding the tree when the client's copy is current
+            etag = self._get_tree_etag(queryset)
+            if etag_matches(request, etag):
+                return HttpResponseNotModified()
+            
             # Tree view - return hierarchical structure
-            serializer = TaskTreeSerializer(queryset, many=True, context={'request': request})
-            return Response({
+            roots = list(queryset)
+            response = Response({
                 'code': 200,
                 'message': 'success',
                 'data': {
-                    'items': serializer.data
+                    'items': serialize_task_tree(
+                        roots, self._get_children_map(roots), context
+                    )
                 }
             })
+            response['ETag'] = etag
+            return response
         
-        # Flat view - apply permission filtering
-        results = []
-        for task in queryset:
-            # Check if user can view full details
-            if (user.is_super_admin or 
-                user.is_team_admin or 
-                task.assignee_id == user.id):
-                results.append(task)
-            else:
-                # Add masked task
-                results.append(task)
-        
-        page = self.paginate_queryset(results)
+        # Flat view - paginate in the database, mask per task when serializing
+        queryset = queryset.only(*self.flat_view_fields)
+        page = self.paginate_queryset(queryset)
         if page is not None:
-            # Serialize with permission check
-            data = []
-            for task in page:
-                if (user.is_super_admin or 
-                    user.is_team_admin or 
-                    task.assignee_id == user.id):
-                    data.append(TaskListSerializer(task, context={'request': request}).data)
-                else:
-                    data.append(MaskedTaskSerializer(task).data)
-            return self.get_paginated_response(data)
-        
-        data = []
-        for task in results:
-            if (user.is_super_admin or 
-                user.is_team_admin or 
-                task.assignee_id == user.id):
-                data.append(TaskListSerializer(task, context={'request': request}).data)
-            else:
-                data.append(MaskedTaskSerializer(task).data)
+            return self.get_paginated_response(self._serialize_tasks(page, context))
         
         return Response({
             'code': 200,
             'message': 'success',
             'data': {
-                'items': data
+                'items': self._serialize_tasks(list(queryset), context)
             }
         })
+    
+    def _serialize_tasks(self, tasks, context):
+        """Serialize tasks in order, masking those the user cannot view.
+        
+        Visible and masked tasks are each serialized with one many=True
+        serializer instead of one serializer per task.
+        """
+        request = self.request
+        
+        # Admins see every task in full, no partitioning needed
+        if is_privileged(request):
+            return TaskListSerializer(tasks, many=True, context=context).data
+        
+        # Members can only view their own tasks
+        user_id = request.user.id
+        visible, masked = [], []
+        for task in tasks:
+            if task.assignee_id == user_id:
+                visible.append(task)
+            else:
+                masked.append(task)
+        
+        data_by_id = {
+            item['id']: item
+            for item in TaskListSerializer(visible, many=True, context=context).data
+        }
+        data_by_id.update(
+            (item['id'], item)
+            for item in MaskedTaskSerializer(masked, many=True).data
+        )
+        return [data_by_id[task.id] for task in tasks]
+    
+    def _get_tree_etag(self, queryset):
+        """Build the tree view ETag from the project's task versions.
+        
+        The task version changes with any task save, creation, deletion or
+        status change in the project, and the users version with any username
+        or avatar change. The user, their role, the archive state, whether
+        they may see the project and the query string are part of the tag
+        because the tree is filtered and flagged by them.
+        """
+        project = getattr(self, 'project', None)
+        versions = ()
+        if project is not None:
+            versions = get_versions(project_tasks_version_key(project.id), USERS_VERSION_KEY)
+        return make_etag(
+            self.request.user.id,
+            is_privileged(self.request),
+            project.is_archived if project is not None else None,
+            queryset.query.is_empty(),
+            self.request.META.get('QUERY_STRING', ''),
+            *versions
+        )
+    
+    def _get_children_map(self, roots):
+        """Fetch all subtasks of the project in one query, grouped by parent id."""
+        children_map = defaultdict(list)
+        if not roots:
+            return children_map
+        
+        user = self.request.user
+        subtasks = Task.objects.filter(
+            project_id=self.kwargs.get('project_id'), level__gt=1
+        )
+        
+        # For members, only show their own subtasks
+        if not is_privileged(self.request):
+            subtasks = subtasks.filter(assignee=user)
+        
+        for task in annotate_subtask_counts(subtasks.select_related('assignee')):
+            children_map[task.parent_id].append(task)
+        return children_map
 
 
 class TaskCreateView(generics.CreateAPIView):
@@ -169,7 +271,7 @@ class TaskCreateView(generics.CreateAPIView):
         project_id = kwargs.get('project_id')
         
         try:
-            project = Project.objects.get(id=project_id)
+            project = Project.objects.only('id', 'is_archived', 'title').get(id=project_id)
         except Project.DoesNotExist:
             raise ResourceNotFound('项目不存在')
         
@@ -179,7 +281,7 @@ class TaskCreateView(generics.CreateAPIView):
         
         serializer = self.get_serializer(
             data=request.data,
-            context={'project_id': project_id, 'request': request}
+            context={'project': project, 'project_id': project_id, 'request': request}
         )
         serializer.is_valid(raise_exception=True)
         
@@ -208,7 +310,9 @@ class SubtaskCreateView(generics.CreateAPIView):
         task_id = kwargs.get('pk')
         
         try:
-            parent_task = Task.objects.get(id=task_id)
+            parent_task = Task.objects.select_related('project').only(
+                'id', 'assignee', 'level', 'path', 'project__id', 'project__is_archived'
+            ).get(id=task_id)
         except Task.DoesNotExist:
             raise ResourceNotFound('任务不存在')
         
@@ -221,7 +325,7 @@ class SubtaskCreateView(generics.CreateAPIView):
             raise PermissionDenied('只能为自己的任务创建子任务', code=3003)
         
         # Check level limit
-        if parent_task.level >= 3:
+        if parent_task.level >= MAX_TASK_LEVEL:
             raise ValidationError('已达到最大层级深度（3层）', code=3002)
         
         serializer = self.get_serializer(data=request.data)
@@ -243,19 +347,23 @@ class TaskDetailView(generics.RetrieveAPIView):
     """Get task detail."""
     serializer_class = TaskDetailSerializer
     permission_classes = [IsTeamMember]
-    queryset = Task.objects.all()
+    queryset = Task.objects.select_related('project', 'assignee')
     lookup_url_kwarg = 'pk'
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if include_requested(self.request, 'attachments'):
+            queryset = queryset.prefetch_related(Prefetch(
+                'attachments',
+                queryset=TaskAttachment.objects.select_related('uploaded_by')
+            ))
+        return queryset
+    
     def retrieve(self, request, *args, **kwargs):
         task = self.get_object()
-        user = request.user
         
         # Check permission
-        can_view_full = (
-            user.is_super_admin or
-            user.is_team_admin or
-            task.assignee_id == user.id
-        )
+        can_view_full = can_access_task(request, task)
         
         if not can_view_full:
             # Return masked data
@@ -277,9 +385,10 @@ class TaskUpdateView(generics.UpdateAPIView):
     """Update task."""
     serializer_class = TaskUpdateSerializer
     permission_classes = [IsTeamMember]
-    queryset = Task.objects.all()
+    queryset = Task.objects.select_related('project', 'assignee')
     lookup_url_kwarg = 'pk'
     
+    @transaction.atomic
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         task = self.get_object()
@@ -290,11 +399,7 @@ class TaskUpdateView(generics.UpdateAPIView):
             raise ValidationError('项目已归档，无法修改任务', code=3006)
         
         # Check permission
-        can_edit = (
-            user.is_super_admin or
-            user.is_team_admin or
-            task.assignee_id == user.id
-        )
+        can_edit = can_access_task(request, task)
         
         if not can_edit:
             raise PermissionDenied('无权修改此任务', code=3004)
@@ -312,22 +417,28 @@ class TaskUpdateView(generics.UpdateAPIView):
         serializer = self.get_serializer(task, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         
-        # Update task
-        for field, value in serializer.validated_data.items():
-            setattr(task, field, value)
-        task.save()
-        
-        # Record history for changed fields
-        for field, new_value in serializer.validated_data.items():
-            old_value = old_values.get(field)
-            if old_value != new_value:
-                TaskHistory.objects.create(
+        changed_fields = [
+            field for field, value in serializer.validated_data.items()
+            if old_values.get(field) != value
+        ]
+        
+        # Update only the changed columns; nothing to write for a no-op update
+        if changed_fields:
+            for field in changed_fields:
+                setattr(task, field, serializer.validated_data[field])
+            task.save(update_fields=changed_fields + ['updated_at'])
+            
+            # Record history for changed fields in one INSERT
+            TaskHistory.objects.bulk_create([
+                TaskHistory(
                     task=task,
                     changed_by=user,
                     field_name=field,
-                    old_value=str(old_value) if old_value else '',
-                    new_value=str(new_value) if new_value else ''
+                    old_value=str(old_values[field]) if old_values[field] else '',
+                    new_value=str(getattr(task, field)) if getattr(task, field) else ''
                 )
+                for field in changed_fields
+            ])
         
         return Response({
             'code': 200,
@@ -340,9 +451,13 @@ class TaskStatusUpdateView(generics.UpdateAPIView):
     """Update task status."""
     serializer_class = TaskStatusUpdateSerializer
     permission_classes = [IsTeamMember]
-    queryset = Task.objects.all()
+    # Only the columns the status change reads or writes
+    queryset = Task.objects.select_related('project').only(
+        'id', 'assignee', 'status', 'updated_at', 'project__id', 'project__is_archived'
+    )
     lookup_url_kwarg = 'pk'
     
+    @transaction.atomic
     def update(self, request, *args, **kwargs):
         task = self.get_object()
         user = request.user
@@ -352,11 +467,7 @@ class TaskStatusUpdateView(generics.UpdateAPIView):
             raise ValidationError('项目已归档，无法修改任务状态', code=3006)
         
         # Check permission
-        can_edit = (
-            user.is_super_admin or
-            user.is_team_admin or
-            task.assignee_id == user.id
-        )
+        can_edit = can_access_task(request, task)
         
         if not can_edit:
             raise PermissionDenied('无权修改此任务状态', code=3004)
@@ -387,12 +498,19 @@ class TaskDeleteView(generics.DestroyAPIView):
     queryset = Task.objects.all()
     lookup_url_kwarg = 'pk'
     
+    def get_queryset(self):
+        # Fetch the subtask check and the delete log's relations with the task
+        return Task.objects.annotate(
+            has_children=Exists(Task.objects.filter(parent_id=OuterRef('pk')))
+        ).select_related('project', 'assignee', 'created_by')
+    
+    @transaction.atomic
     def destroy(self, request, *args, **kwargs):
         task = self.get_object()
         user = request.user
         
         # Check if has subtasks
-        if task.children.exists():
+        if task.has_children:
             raise ValidationError('存在子任务，无法删除', code=3005)
         
         # Get deletion reason from request (optional)
@@ -412,16 +530,22 @@ class TaskDeleteView(generics.DestroyAPIView):
     
     def _create_delete_log(self, task, deleted_by, deletion_reason):
         """Create a log entry for the deleted task."""
+        # Related values shared by the JSON snapshot and the log columns
+        project_title = task.project.title if task.project_id else ''
+        assignee = task.assignee if task.assignee_id else None
+        assignee_name = assignee.username if assignee else None
+        created_by_name = task.created_by.username if task.created_by_id else None
+        
         # Build full task data as JSON for complete recovery if needed
         task_data = {
             'id': task.id,
             'title': task.title,
             'description': task.description,
             'project_id': task.project_id,
-            'project_title': task.project.title if task.project else '',
+            'project_title': project_title,
             'assignee_id': task.assignee_id,
-            'assignee_name': task.assignee.username if task.assignee else None,
-            'assignee_avatar': task.assignee.avatar if task.assignee else None,
+            'assignee_name': assignee_name,
+            'assignee_avatar': assignee.avatar if assignee else None,
             'status': task.status,
             'priority': task.priority,
             'level': task.level,
@@ -431,7 +555,7 @@ class TaskDeleteView(generics.DestroyAPIView):
             'end_date': task.end_date.isoformat() if task.end_date else None,
             'normal_flag': task.normal_flag,
             'created_by_id': task.created_by_id,
-            'created_by_name': task.created_by.username if task.created_by else None,
+            'created_by_name': created_by_name,
             'created_at': task.created_at.isoformat() if task.created_at else None,
             'updated_at': task.updated_at.isoformat() if task.updated_at else None,
         }
@@ -441,9 +565,9 @@ class TaskDeleteView(generics.DestroyAPIView):
             title=task.title,
             description=task.description,
             project_id=task.project_id,
-            project_title=task.project.title if task.project else '',
+            project_title=project_title,
             assignee_id=task.assignee_id,
-            assignee_name=task.assignee.username if task.assignee else None,
+            assignee_name=assignee_name,
             status=task.status,
             priority=task.priority,
             level=task.level,
@@ -452,7 +576,7 @@ class TaskDeleteView(generics.DestroyAPIView):
             start_date=task.start_date,
             end_date=task.end_date,
             created_by_id=task.created_by_id,
-            created_by_name=task.created_by.username if task.created_by else None,
+            created_by_name=created_by_name,
             original_created_at=task.created_at,
             deleted_by=deleted_by,
             deleted_by_name=deleted_by.username if deleted_by else None,
@@ -475,27 +599,37 @@ class TaskHistoryView(generics.ListAPIView):
         
         # Check if user can view task
         try:
-            task = Task.objects.get(id=self.kwargs.get('pk'))
+            task = Task.objects.only('id', 'assignee').get(id=self.kwargs.get('pk'))
         except Task.DoesNotExist:
             raise ResourceNotFound('任务不存在')
         
-        user = request.user
-        can_view = (
-            user.is_super_admin or
-            user.is_team_admin or
-            task.assignee_id == user.id
-        )
+        can_view = can_access_task(request, task)
         
         if not can_view:
             raise PermissionDenied('无权查看此任务历史', code=3004)
         
-        serializer = self.get_serializer(queryset, many=True)
+        # Same output as TaskHistorySerializer, without building model instances
+        histories = [
+            {
+                'id': history['id'],
+                'field_name': history['field_name'],
+                'old_value': history['old_value'],
+                'new_value': history['new_value'],
+                'changed_by': history['changed_by_id'],
+                'changed_by_name': history['changed_by__username'],
+                'changed_at': _datetime_field.to_representation(history['changed_at'])
+            }
+            for history in queryset.values(
+                'id', 'field_name', 'old_value', 'new_value',
+                'changed_by_id', 'changed_by__username', 'changed_at'
+            )
+        ]
         return Response({
             'code': 200,
             'message': 'success',
             'data': {
                 'task_id': task.id,
-                'histories': serializer.data
+                'histories': histories
             }
         })
 
@@ -512,19 +646,25 @@ class TaskProgressView(generics.GenericAPIView):
         except Project.DoesNotExist:
             raise ResourceNotFound('项目不存在')
         
-        main_tasks = Task.objects.filter(project=project, level=1)
+        # One GROUP BY query; at most one row per (status, flag) pair
+        stats = {
+            'total': 0, 'planning': 0, 'pending': 0,
+            'in_progress': 0, 'completed': 0, 'overdue': 0
+        }
+        rows = Task.objects.filter(project=project, level=1).values_list(
+            'status', 'normal_flag'
+        ).annotate(count=Count('id')).order_by()
+        for task_status, normal_flag, count in rows:
+            stats['total'] += count
+            if task_status in stats:
+                stats[task_status] += count
+            if normal_flag == 'overdue':
+                stats['overdue'] += count
         
         return Response({
             'code': 200,
             'message': 'success',
-            'data': {
-                'total': main_tasks.count(),
-                'planning': main_tasks.filter(status='planning').count(),
-                'pending': main_tasks.filter(status='pending').count(),
-                'in_progress': main_tasks.filter(status='in_progress').count(),
-                'completed': main_tasks.filter(status='completed').count(),
-                'overdue': main_tasks.filter(normal_flag='overdue').count()
-            }
+            'data': stats
         })
 
 
@@ -543,14 +683,14 @@ class TaskCreateUnassignedView(generics.CreateAPIView):
         if not project_id:
             raise ValidationError('项目ID不能为空', code=2001)
         
+        user = request.user
         try:
-            project = Project.objects.get(id=project_id)
+            project = get_project_for_user(project_id, user)
         except Project.DoesNotExist:
             raise ResourceNotFound('项目不存在')
         
         # Check if user is project member
-        user = request.user
-        if not (user.is_super_admin or user.is_team_admin or project.has_member(user)):
+        if not (is_privileged(request) or project.is_member):
             raise PermissionDenied('无权在此项目中创建任务', code=3004)
         
         # Check if project is archived
@@ -611,9 +751,10 @@ class TaskClaimView(generics.GenericAPIView):
     """
     permission_classes = [IsTeamMember]
     
+    @transaction.atomic
     def post(self, request, pk, *args, **kwargs):
         try:
-            task = Task.objects.get(id=pk, level=1)
+            task = Task.objects.select_related('project').get(id=pk, level=1)
         except Task.DoesNotExist:
             raise ResourceNotFound('任务不存在')
         
@@ -645,20 +786,15 @@ class TaskClaimView(generics.GenericAPIView):
             raise PermissionDenied('该任务已被其他人领取', code=3011)
         
         # Update task
-        from datetime import datetime
+        from datetime import date, datetime, time
         try:
             # Parse end_date - support both date and datetime format
             if isinstance(end_date, str):
-                # Try datetime format first, then date format
                 try:
-                    end_date = datetime.strptime(end_date, '%Y-%m-%dT%H:%M:%S')
+                    # Date only, set time to end of day
+                    end_date = datetime.combine(date.fromisoformat(end_date), time(23, 59, 59))
                 except ValueError:
-                    try:
-                        end_date = datetime.strptime(end_date, '%Y-%m-%d %H:%M:%S')
-                    except ValueError:
-                        # Fallback to date only, set time to end of day
-                        end_date = datetime.strptime(end_date, '%Y-%m-%d')
-                        end_date = end_date.replace(hour=23, minute=59, second=59)
+                    end_date = datetime.fromisoformat(end_date)
         except ValueError:
             raise ValidationError('结束时间格式错误，应为 YYYY-MM-DDTHH:mm:ss 或 YYYY-MM-DD', code=3009)
         
@@ -708,6 +844,69 @@ class TaskClaimView(generics.GenericAPIView):
 
 
 
+# Columns read by build_delete_log_data()
+DELETE_LOG_FIELDS = (
+    'id', 'original_task_id', 'title', 'description',
+    'project_id', 'project_title', 'assignee_id', 'assignee_name',
+    'created_by_id', 'created_by_name', 'status', 'priority', 'level',
+    'start_date', 'end_date', 'original_created_at',
+    'deleted_by_id', 'deleted_by_name', 'deleted_at', 'deletion_reason',
+)
+
+
+def build_delete_log_data(log, detail=False):
+    """Build deletion log response data from a values() row.
+
+    Args:
+        log: Row with DELETE_LOG_FIELDS and assignee_avatar (plus parent_id,
+            path and task_data_json when detail is True)
+        detail: Include the detail-only fields
+
+    Returns:
+        Response dict
+    """
+    data = {
+        'id': log['id'],
+        'original_task_id': log['original_task_id'],
+        'title': log['title'],
+        'description': log['description'],
+        'project': {
+            'id': log['project_id'],
+            'title': log['project_title']
+        },
+        'assignee': {
+            'id': log['assignee_id'],
+            'username': log['assignee_name'],
+            'avatar': log['assignee_avatar']
+        } if log['assignee_id'] else None,
+        'created_by': {
+            'id': log['created_by_id'],
+            'username': log['created_by_name']
+        } if log['created_by_id'] else None,
+        'status': log['status'],
+        'priority': log['priority'],
+        'level': log['level'],
+    }
+    if detail:
+        data['parent_id'] = log['parent_id']
+        data['path'] = log['path']
+    data.update({
+        'start_date': log['start_date'].isoformat() if log['start_date'] else None,
+        'end_date': log['end_date'].isoformat() if log['end_date'] else None,
+        'original_created_at': log['original_created_at'].isoformat() if log['original_created_at'] else None,
+        'deleted_by': {
+            'id': log['deleted_by_id'],
+            'username': log['deleted_by_name']
+        },
+        'deleted_at': log['deleted_at'].isoformat(),
+        'deletion_reason': log['deletion_reason'],
+    })
+    if detail:
+        # Full task data for potential recovery
+        data['task_data_json'] = log['task_data_json']
+    return data
+
+
 class TaskDeleteLogListView(generics.ListAPIView):
     """List task deletion logs (admin only)."""
     permission_classes = [IsAdminOrSuperAdmin]
@@ -736,55 +935,28 @@ class TaskDeleteLogListView(generics.ListAPIView):
         # Search by title
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(title__icontains=search)
+            queryset = search_filter(queryset, ('title',), search)
         
-        return queryset.select_related('deleted_by')
+        return queryset.order_by('-deleted_at')
     
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
         
+        # Fetch plain rows; only the avatar is read out of task_data_json
+        queryset = queryset.values(
+            *DELETE_LOG_FIELDS,
+            assignee_avatar=KeyTransform('assignee_avatar', 'task_data_json')
+        )
+        
         # Pagination
         from config.pagination import StandardPagination
         paginator = StandardPagination()
         page = paginator.paginate_queryset(queryset, request)
         
-        data = []
-        for log in (page if page is not None else queryset):
-            # Get avatar from task_data_json if available
-            avatar = None
-            if log.task_data_json and isinstance(log.task_data_json, dict):
-                avatar = log.task_data_json.get('assignee_avatar')
-            data.append({
-                'id': log.id,
-                'original_task_id': log.original_task_id,
-                'title': log.title,
-                'description': log.description,
-                'project': {
-                    'id': log.project_id,
-                    'title': log.project_title
-                },
-                'assignee': {
-                    'id': log.assignee_id,
-                    'username': log.assignee_name,
-                    'avatar': avatar
-                } if log.assignee_id else None,
-                'created_by': {
-                    'id': log.created_by_id,
-                    'username': log.created_by_name
-                } if log.created_by_id else None,
-                'status': log.status,
-                'priority': log.priority,
-                'level': log.level,
-                'start_date': log.start_date.isoformat() if log.start_date else None,
-                'end_date': log.end_date.isoformat() if log.end_date else None,
-                'original_created_at': log.original_created_at.isoformat() if log.original_created_at else None,
-                'deleted_by': {
-                    'id': log.deleted_by.id if log.deleted_by else None,
-                    'username': log.deleted_by_name
-                },
-                'deleted_at': log.deleted_at.isoformat(),
-                'deletion_reason': log.deletion_reason
-            })
+        data = [
+            build_delete_log_data(log)
+            for log in (page if page is not None else queryset)
+        ]
         
         if page is not None:
             return paginator.get_paginated_response(data)
@@ -804,54 +976,25 @@ class TaskDeleteLogDetailView(generics.RetrieveAPIView):
     
     def get_object(self):
         log_id = self.kwargs.get('pk')
-        try:
-            return TaskDeleteLog.objects.get(id=log_id)
-        except TaskDeleteLog.DoesNotExist:
+        log = TaskDeleteLog.objects.filter(id=log_id).values(
+            *DELETE_LOG_FIELDS, 'parent_id', 'path', 'task_data_json'
+        ).first()
+        if log is None:
             raise ResourceNotFound('删除日志不存在')
+        return log
     
     def retrieve(self, request, *args, **kwargs):
         log = self.get_object()
         
         # Get avatar from task_data_json if available
-        avatar = None
-        if log.task_data_json and isinstance(log.task_data_json, dict):
-            avatar = log.task_data_json.get('assignee_avatar')
+        task_data = log['task_data_json']
+        if task_data and isinstance(task_data, dict):
+            log['assignee_avatar'] = task_data.get('assignee_avatar')
+        else:
+            log['assignee_avatar'] = None
 
         return Response({
             'code': 200,
             'message': 'success',
-            'data': {
-                'id': log.id,
-                'original_task_id': log.original_task_id,
-                'title': log.title,
-                'description': log.description,
-                'project': {
-                    'id': log.project_id,
-                    'title': log.project_title
-                },
-                'assignee': {
-                    'id': log.assignee_id,
-                    'username': log.assignee_name,
-                    'avatar': avatar
-                } if log.assignee_id else None,
-                'created_by': {
-                    'id': log.created_by_id,
-                    'username': log.created_by_name
-                } if log.created_by_id else None,
-                'status': log.status,
-                'priority': log.priority,
-                'level': log.level,
-                'parent_id': log.parent_id,
-                'path': log.path,
-                'start_date': log.start_date.isoformat() if log.start_date else None,
-                'end_date': log.end_date.isoformat() if log.end_date else None,
-                'original_created_at': log.original_created_at.isoformat() if log.original_created_at else None,
-                'deleted_by': {
-                    'id': log.deleted_by.id if log.deleted_by else None,
-                    'username': log.deleted_by_name
-                },
-                'deleted_at': log.deleted_at.isoformat(),
-                'deletion_reason': log.deletion_reason,
-                'task_data_json': log.task_data_json  # Full task data for potential recovery
-            }
+            'data': build_delete_log_data(log, detail=True)
         })
@@ -1,110 +1,165 @@
 """
 Dashboard views for TeamSync.
 """
-from rest_framework import generics, permissions
-from rest_framework.response import Response
-from django.db.models import Q, Count
+from rest_framework.views import APIView
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.db.models import Q, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, time, timedelta
+from functools import lru_cache
 
-from apps.projects.models import Project
-from apps.tasks.models import Task
+from apps.projects.models import Project, ProjectMember
+from apps.tasks.models import Task, ACTIVE_STATUSES
 from apps.accounts.models import User
 from config.permissions import IsAdminOrSuperAdmin, IsTeamMember
+from config.cache import (
+    PROJECTS_VERSION_KEY, MEMBERSHIPS_VERSION_KEY, USERS_VERSION_KEY,
+    assignee_version_key, project_tasks_version_key, get_versions, get_or_build
+)
+from config.renderers import ORJSONRenderer, orjson_response
+from config.etag import make_etag, etag_matches
 
 
-class MemberDashboardView(generics.GenericAPIView):
+# Seconds to cache a team's project IDs; the key changes on any project save
+TEAM_PROJECT_IDS_CACHE_TIMEOUT = 3600
+
+
+# Pre-encoded admin dashboard response for users without a team
+_EMPTY_ADMIN_DASHBOARD = ORJSONRenderer().render({
+    'code': 200,
+    'message': 'success',
+    'data': {
+        'project_overview': {
+            'total': 0,
+            'active': 0,
+            'archived': 0,
+            'overdue_count': 0
+        },
+        'projects': [],
+        'member_workload': []
+    }
+})
+
+
+@lru_cache(maxsize=8)
+def _week_bounds(today):
+    """Get today and its Monday-Sunday week as local-midnight datetimes.
+    
+    end_date is matched against these values, so the range stays a plain
+    indexed comparison on the column.
+    
+    Args:
+        today: The current date
+    
+    Returns:
+        Tuple of (today, week start, week end) aware datetimes
+    """
+    week_start = today - timedelta(days=today.weekday())
+    week_end = week_start + timedelta(days=6)
+    return tuple(
+        timezone.make_aware(datetime.combine(day, time.min))
+        for day in (today, week_start, week_end)
+    )
+
+
+# Task columns listed on the member dashboard, unpacked in this order
+DASHBOARD_TASK_FIELDS = ('id', 'title', 'status', 'end_date', 'is_overdue', 'project__title')
+
+
+class MemberDashboardView(APIView):
     """Get member dashboard data."""
     permission_classes = [IsTeamMember]
     
     def get(self, request, *args, **kwargs):
         """Get member dashboard data."""
         user = request.user
-        today = timezone.now().date()
-        week_start = today - timedelta(days=today.weekday())
-        week_end = week_start + timedelta(days=6)
+        now = timezone.now()
+        today = now.date()
         
-        # Today's tasks (exclude archived projects)
-        today_tasks = Task.objects.filter(
-            assignee=user,
-            end_date=today,
-            status__in=['planning', 'pending', 'in_progress'],
-            project__is_archived=False
-        ).select_related('project')
+        # Cached until the day changes or the user's tasks / any project change
+        cache_key = 'dashboard:member:{}:{}:{}:{}'.format(
+            user.id, today.isoformat(),
+            *get_versions(assignee_version_key(user.id), PROJECTS_VERSION_KEY)
+        )
+        # The key already identifies the data version, so it doubles as the ETag
+        etag = make_etag(cache_key)
+        if etag_matches(request, etag):
+            return HttpResponseNotModified()
         
-        today_data = {
-            'total': today_tasks.count(),
-            'tasks': [
-                {
-                    'id': task.id,
-                    'title': task.title,
-                    'project': task.project.title if task.project else None,
-                    'status': task.status,
-                    'end_date': task.end_date.isoformat() if task.end_date else None,
-                    'is_overdue': task.normal_flag == 'overdue'
-                }
-                for task in today_tasks
-            ]
-        }
+        data = cache.get(cache_key)
+        if data is None:
+            data = self._get_data(user, today)
+            seconds_left = (
+                datetime.combine(today + timedelta(days=1), time.min, tzinfo=now.tzinfo) - now
+            ).total_seconds()
+            cache.set(cache_key, data, timeout=max(int(seconds_left), 1))
         
-        # This week's tasks (exclude archived projects)
-        week_tasks = Task.objects.filter(
+        response = orjson_response({
+            'code': 200,
+            'message': 'success',
+            'data': data
+        })
+        response['ETag'] = etag
+        return response
+    
+    def _get_data(self, user, today):
+        """Build member dashboard data for the given day."""
+        today_at, week_start_at, week_end_at = _week_bounds(today)
+        
+        # This week's and overdue tasks in one query (exclude archived projects)
+        rows = Task.objects.filter(
+            Q(end_date__gte=week_start_at, end_date__lte=week_end_at) |
+            Q(is_overdue=True),
             assignee=user,
-            end_date__gte=week_start,
-            end_date__lte=week_end,
-            status__in=['planning', 'pending', 'in_progress'],
+            status__in=ACTIVE_STATUSES,
             project__is_archived=False
-        ).exclude(end_date=today).select_related('project')
+        ).values_list(*DASHBOARD_TASK_FIELDS)
+        
+        # Split into sections; an overdue task also shows in today/this week
+        today_tasks, week_tasks, overdue_tasks = [], [], []
+        for task_id, title, task_status, end_date, is_overdue, project_title in rows:
+            end_date_str = end_date.isoformat() if end_date else None
+            if end_date is not None and week_start_at <= end_date <= week_end_at:
+                (today_tasks if end_date == today_at else week_tasks).append({
+                    'id': task_id,
+                    'title': title,
+                    'project': project_title,
+                    'status': task_status,
+                    'end_date': end_date_str,
+                    'is_overdue': is_overdue
+                })
+            if is_overdue:
+                overdue_tasks.append({
+                    'id': task_id,
+                    'title': title,
+                    'project': project_title,
+                    'end_date': end_date_str,
+                    'is_overdue': True
+                })
         
+        today_data = {
+            'total': len(today_tasks),
+            'tasks': today_tasks
+        }
         week_data = {
-            'total': week_tasks.count(),
-            'tasks': [
-                {
-                    'id': task.id,
-                    'title': task.title,
-                    'project': task.project.title if task.project else None,
-                    'status': task.status,
-                    'end_date': task.end_date.isoformat() if task.end_date else None,
-                    'is_overdue': task.normal_flag == 'overdue'
-                }
-                for task in week_tasks
-            ]
+            'total': len(week_tasks),
+            'tasks': week_tasks
         }
-        
-        # Overdue tasks (exclude archived projects)
-        overdue_tasks = Task.objects.filter(
-            assignee=user,
-            normal_flag='overdue',
-            status__in=['planning', 'pending', 'in_progress'],
-            project__is_archived=False
-        ).select_related('project')
-        
         overdue_data = {
-            'total': overdue_tasks.count(),
-            'tasks': [
-                {
-                    'id': task.id,
-                    'title': task.title,
-                    'project': task.project.title if task.project else None,
-                    'end_date': task.end_date.isoformat() if task.end_date else None,
-                    'is_overdue': True
-                }
-                for task in overdue_tasks
-            ]
+            'total': len(overdue_tasks),
+            'tasks': overdue_tasks
         }
         
-        return Response({
-            'code': 200,
-            'message': 'success',
-            'data': {
-                'today': today_data,
-                'this_week': week_data,
-                'overdue': overdue_data
-            }
-        })
+        return {
+            'today': today_data,
+            'this_week': week_data,
+            'overdue': overdue_data
+        }
 
 
-class AdminDashboardView(generics.GenericAPIView):
+class AdminDashboardView(APIView):
     """Get admin dashboard data."""
     permission_classes = [IsAdminOrSuperAdmin]
     
@@ -114,76 +169,131 @@ class AdminDashboardView(generics.GenericAPIView):
         team = user.team
         
         if not team:
-            return Response({
-                'code': 200,
-                'message': 'success',
-                'data': {
-                    'project_overview': {
-                        'total': 0,
-                        'active': 0,
-                        'archived': 0,
-                        'overdue_count': 0
-                    },
-                    'projects': [],
-                    'member_workload': []
-                }
-            })
+            return HttpResponse(_EMPTY_ADMIN_DASHBOARD, content_type=ORJSONRenderer.media_type)
         
-        # Project overview
-        all_projects = Project.objects.filter(team=team)
-        active_projects = all_projects.filter(is_archived=False)
-        archived_projects = all_projects.filter(is_archived=True)
+        etag = self._get_etag(team)
+        if etag_matches(request, etag):
+            return HttpResponseNotModified()
         
-        overdue_count = Task.objects.filter(
+        response = orjson_response({
+            'code': 200,
+            'message': 'success',
+            'data': {
+                'project_overview': self._get_project_overview(team),
+                'projects': self._get_projects(team),
+                'member_workload': self._get_member_workload(team)
+            }
+        })
+        response['ETag'] = etag
+        return response
+    
+    def _get_etag(self, team):
+        """Build the admin dashboard ETag from the team's data versions.
+        
+        Tasks are covered by the task version of each team project, projects
+        by the projects version, member counts by the memberships version and
+        the member list by the users version; reading them costs no queries
+        while the team's project IDs are cached.
+        """
+        projects_version, = get_versions(PROJECTS_VERSION_KEY)
+        project_ids = get_or_build(
+            f'dashboard:admin:project_ids:{team.id}:{projects_version}',
+            lambda: list(Project.objects.filter(team=team).values_list('id', flat=True)),
+            TEAM_PROJECT_IDS_CACHE_TIMEOUT
+        )
+        return make_etag(
+            team.id, projects_version,
+            *get_versions(
+                MEMBERSHIPS_VERSION_KEY, USERS_VERSION_KEY,
+                *(project_tasks_version_key(project_id) for project_id in project_ids)
+            )
+        )
+    
+    def _get_project_overview(self, team):
+        """Project counts for the team."""
+        project_overview = Project.objects.filter(team=team).aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(is_archived=False)),
+            archived=Count('id', filter=Q(is_archived=True))
+        )
+        project_overview['overdue_count'] = Task.objects.filter(
             project__team=team,
             project__is_archived=False,
-            normal_flag='overdue',
-            status__in=['planning', 'pending', 'in_progress']
+            is_overdue=True,
+            status__in=ACTIVE_STATUSES
         ).count()
+        return project_overview
+    
+    def _get_projects(self, team):
+        """Latest 10 active projects with progress and counts."""
+        active_projects = Project.objects.filter(team=team, is_archived=False)
         
-        project_overview = {
-            'total': all_projects.count(),
-            'active': active_projects.count(),
-            'archived': archived_projects.count(),
-            'overdue_count': overdue_count
-        }
+        # Task counts joined, member count as a subquery
+        member_count = ProjectMember.objects.filter(
+            project=OuterRef('pk'), user__is_active=True
+        ).order_by().values('project').annotate(count=Count('id')).values('count')
+        top_projects = active_projects.annotate(
+            main_task_count=Count('tasks', filter=Q(tasks__level=1)),
+            completed_task_count=Count(
+                'tasks', filter=Q(tasks__level=1, tasks__status='completed')
+            ),
+            overdue_task_count_ann=Count('tasks', filter=Q(
+                tasks__is_overdue=True,
+                tasks__status__in=ACTIVE_STATUSES
+            )),
+            member_count_ann=Coalesce(Subquery(member_count), 0)
+        ).order_by('-created_at').values(
+            'id', 'title', 'status', 'main_task_count', 'completed_task_count',
+            'overdue_task_count_ann', 'member_count_ann'
+        )[:10]
         
-        # Projects list
         projects = []
-        for project in active_projects.order_by('-created_at')[:10]:
+        for project in top_projects:
+            total = project['main_task_count']
             projects.append({
-                'id': project.id,
-                'title': project.title,
-                'progress': project.progress,
-                'member_count': project.member_count,
-                'overdue_task_count': project.overdue_task_count,
-                'status': project.status
+                'id': project['id'],
+                'title': project['title'],
+                # Same rounding as Project.progress
+                'progress': round((project['completed_task_count'] / total) * 100, 2) if total else 0.0,
+                'member_count': project['member_count_ann'],
+                'overdue_task_count': project['overdue_task_count_ann'],
+                'status': project['status']
             })
         
-        # Member workload
-        member_workload = []
-        for member in User.objects.filter(team=team, is_active=True):
-            assigned_tasks = Task.objects.filter(
+        return projects
+    
+    def _get_member_workload(self, team):
+        """Task counts for each active team member."""
+        # Group the team's main tasks by assignee on the tasks table alone
+        counts = {
+            row['assignee']: row
+            for row in Task.objects.filter(
                 project__team=team,
                 project__is_archived=False,
                 level=1,
-                assignee=member
+                assignee__isnull=False
+            ).order_by().values('assignee').annotate(
+                assigned=Count('id'),
+                completed=Count('id', filter=Q(status='completed')),
+                overdue=Count('id', filter=Q(is_overdue=True))
             )
-            
+        }
+        no_tasks = {'assigned': 0, 'completed': 0, 'overdue': 0}
+        
+        # Then attach the counts to members, including those without tasks
+        members = User.objects.filter(team=team, is_active=True).order_by(
+            '-created_at'
+        ).values_list('id', 'username')
+        
+        member_workload = []
+        for user_id, username in members.iterator(chunk_size=500):
+            stats = counts.get(user_id, no_tasks)
             member_workload.append({
-                'user_id': member.id,
-                'username': member.username,
-                'assigned_tasks': assigned_tasks.count(),
-                'completed_tasks': assigned_tasks.filter(status='completed').count(),
-                'overdue_tasks': assigned_tasks.filter(normal_flag='overdue').count()
+                'user_id': user_id,
+                'username': username,
+                'assigned_tasks': stats['assigned'],
+                'completed_tasks': stats['completed'],
+                'overdue_tasks': stats['overdue']
             })
         
-        return Response({
-            'code': 200,
-            'message': 'success',
-            'data': {
-                'project_overview': project_overview,
-                'projects': projects,
-                'member_workload': member_workload
-            }
-        })
+        return member_workload
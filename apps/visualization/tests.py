@@ -0,0 +1,220 @@
+"""
+Tests for visualization app.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from apps.accounts.models import Team
+from apps.projects.models import Project
+from apps.tasks.models import Task
+
+User = get_user_model()
+
+
+class CachedPayloadInvalidationTests(APITestCase):
+    """Tests that cached payloads change once a task edit commits."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.team = Team.objects.create(name='Test Team')
+        self.member = User.objects.create_user(
+            username='member',
+            email='member@example.com',
+            password='member123',
+            role='member',
+            team=self.team
+        )
+        self.project = Project.objects.create(title='Project', team=self.team)
+        self.project.add_member(self.member)
+
+        now = timezone.now()
+        self.task = Task.objects.create(
+            project=self.project, title='main', assignee=self.member,
+            start_date=now, end_date=now
+        )
+        self.client.force_authenticate(user=self.member)
+
+    def _edit_title(self, title):
+        """Rename the task through the API and run its on-commit callbacks."""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.patch(
+                f'/api/tasks/{self.task.id}/update/', {'title': title}
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # The versions are only bumped once the transaction commits
+        self.assertTrue(callbacks)
+
+    def _dashboard_titles(self, url):
+        """Get the titles listed under today and this week."""
+        data = self.client.get(url).json()['data']
+        return [
+            task['title']
+            for section in ('today', 'this_week')
+            for task in data[section]['tasks']
+        ]
+
+    def test_member_dashboard_changes(self):
+        """Test the cached member dashboard shows the edited task."""
+        url = '/api/dashboard/member/'
+        self.assertEqual(self._dashboard_titles(url), ['main'])
+
+        self._edit_title('renamed')
+        self.assertEqual(self._dashboard_titles(url), ['renamed'])
+
+    def test_member_dashboard_reassigned(self):
+        """Test reassigning a task drops it from the previous assignee's dashboard."""
+        other = User.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='other123',
+            role='member',
+            team=self.team
+        )
+        url = '/api/dashboard/member/'
+        self.assertEqual(self._dashboard_titles(url), ['main'])
+
+        task = Task.objects.get(pk=self.task.pk)
+        task.assignee = other
+        with self.captureOnCommitCallbacks(execute=True):
+            # The previous assignee is known from loading, so only the UPDATE runs
+            with self.assertNumQueries(1):
+                task.save(update_fields=['assignee', 'updated_at'])
+        self.assertEqual(self._dashboard_titles(url), [])
+
+    def test_project_gantt_changes(self):
+        """Test the cached project Gantt chart shows the edited task."""
+        url = f'/api/visualization/projects/{self.project.id}/gantt/'
+        response = self.client.get(url)
+        self.assertEqual(response.json()['data']['tasks'][0]['title'], 'main')
+
+        self._edit_title('renamed')
+        response = self.client.get(url)
+        self.assertEqual(response.json()['data']['tasks'][0]['title'], 'renamed')
+
+    def test_project_kanban_changes(self):
+        """Test a saved status change moves the task on the cached Kanban board."""
+        url = f'/api/visualization/projects/{self.project.id}/kanban/'
+
+        def board():
+            return {
+                column['id']: [task['title'] for task in column['tasks']]
+                for column in self.client.get(url).json()['data']['columns']
+            }
+
+        self.assertEqual(board()['planning'], ['main'])
+
+        # A task write that commits outside the API invalidates the payload too
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.status = 'in_progress'
+            self.task.save()
+        columns = board()
+        self.assertEqual(columns['planning'], [])
+        self.assertEqual(columns['in_progress'], ['main'])
+
+    def test_project_gantt_unchanged_until_commit(self):
+        """Test the cached Gantt chart is kept while the task save is uncommitted."""
+        url = f'/api/visualization/projects/{self.project.id}/gantt/'
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=False):
+            self.task.title = 'renamed'
+            self.task.save()
+        response = self.client.get(url)
+        self.assertEqual(response.json()['data']['tasks'][0]['title'], 'main')
+
+
+class AdminDashboardAPITests(APITestCase):
+    """Tests for the admin dashboard view."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.team = Team.objects.create(name='Test Team')
+        self.admin = User.objects.create_user(
+            username='admin',
+            email='admin@example.com',
+            password='admin123',
+            role='team_admin',
+            team=self.team
+        )
+        self.member = User.objects.create_user(
+            username='member',
+            email='member@example.com',
+            password='member123',
+            role='member',
+            team=self.team
+        )
+        self.project = Project.objects.create(title='Project', team=self.team)
+        self.project.add_member(self.admin)
+        self.project.add_member(self.member)
+        Project.objects.create(title='Archived', team=self.team, is_archived=True)
+
+        Task.objects.create(
+            project=self.project, title='done', assignee=self.member, status='completed'
+        )
+        Task.objects.create(project=self.project, title='open', assignee=self.member)
+        self.client.force_authenticate(user=self.admin)
+
+    def test_dashboard(self):
+        """Test the overview, project and workload sections."""
+        response = self.client.get('/api/dashboard/admin/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = response.json()['data']
+        self.assertEqual(data['project_overview'], {
+            'total': 2, 'active': 1, 'archived': 1, 'overdue_count': 0
+        })
+        self.assertEqual(data['projects'], [{
+            'id': self.project.id,
+            'title': 'Project',
+            'progress': 50.0,
+            'member_count': 2,
+            'overdue_task_count': 0,
+            'status': self.project.status
+        }])
+        workload = {row['username']: row for row in data['member_workload']}
+        self.assertEqual(workload['member']['assigned_tasks'], 2)
+        self.assertEqual(workload['member']['completed_tasks'], 1)
+        self.assertEqual(workload['admin']['assigned_tasks'], 0)
+
+    def _assert_modified(self, etag, change):
+        """Assert the dashboard ETag changes once change() commits."""
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        response = self.client.get('/api/dashboard/admin/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response['ETag']
+
+    def test_dashboard_not_modified(self):
+        """Test the dashboard is answered with 304 until its data changes."""
+        url = '/api/dashboard/admin/'
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        def deactivate_member():
+            self.member.is_active = False
+            self.member.save(update_fields=['is_active'])
+
+        def add_task():
+            Task.objects.create(project=self.project, title='new')
+
+        def remove_admin():
+            self.project.remove_member(self.admin)
+
+        def archive_project():
+            self.project.is_archived = True
+            self.project.save()
+
+        for change in (deactivate_member, add_task, remove_admin, archive_project):
+            etag = self._assert_modified(etag, change)
+
+        # Login bookkeeping does not change the dashboard
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.save(update_fields=['last_login'])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -2,16 +2,91 @@
 Visualization views for TeamSync.
 """
 from rest_framework import generics, permissions
-from rest_framework.response import Response
-from django.db.models import Q, Count, Case, When, Value, IntegerField
+from django.db.models import (
+    Q, Count, Case, When, Value, IntegerField, Prefetch, Exists, OuterRef
+)
 from django.utils import timezone
-from datetime import timedelta
+from datetime import date, timedelta
+from collections import defaultdict
+from functools import lru_cache
+from itertools import cycle, groupby
+from operator import attrgetter
+import hashlib
 
 from apps.projects.models import Project
-from apps.tasks.models import Task
-from apps.accounts.models import User
-from config.permissions import IsAdminOrSuperAdmin, IsTeamMember
+from apps.tasks.models import (
+    Task, TaskStatus, TaskPriority, MAX_TASK_LEVEL, annotate_subtask_counts
+)
+from config.permissions import IsAdminOrSuperAdmin, IsTeamMember, is_privileged
 from config.exceptions import ResourceNotFound
+from config.search import search_filter
+from config.renderers import orjson_response
+from config.cache import (
+    PROJECTS_VERSION_KEY, USERS_VERSION_KEY, project_tasks_version_key,
+    project_members_version_key, get_versions, get_or_build
+)
+
+
+# Related columns read when serializing a task's assignee / project
+ASSIGNEE_FIELDS = ('assignee__username', 'assignee__avatar')
+PROJECT_FIELDS = ('project__title',)
+
+# Gantt bar progress per status; other statuses are 0
+PROGRESS_MAP = {'completed': 100, 'in_progress': 50}
+
+# Colors assigned to Gantt members / projects in order of appearance
+COLOR_PALETTE = ('#0D9488', '#0891B2', '#10B981', '#F59E0B', '#F43F5E', '#8B5CF6')
+
+# Seconds a cached project Gantt / Kanban payload is served; task, project
+# and user (username, avatar) changes invalidate it earlier
+VISUALIZATION_CACHE_TIMEOUT = 30
+
+# Seconds a user's accessible project IDs are cached; project saves and
+# membership changes invalidate them earlier
+ALLOWED_PROJECTS_CACHE_TIMEOUT = 60
+
+# Most main tasks GlobalTaskListView returns; the response flags truncation
+GLOBAL_TASK_LIST_LIMIT = 1000
+
+# Columns GlobalTaskListView reads for main tasks, fetched as plain rows
+TASK_LIST_FIELDS = (
+    'id', 'title', 'description', 'status', 'priority', 'level', 'path', 'parent_id',
+    'start_date', 'end_date', 'normal_flag', 'is_overdue', 'created_at', 'updated_at',
+    'project_id', 'project__title', 'project__is_archived',
+    'assignee_id', 'assignee__username', 'assignee__avatar',
+    'created_by_id', 'created_by__username',
+    'subtask_count_ann', 'completed_subtask_count_ann',
+)
+
+# Sort weight per priority (higher number = higher priority)
+PRIORITY_ORDER = Case(
+    When(priority='urgent', then=Value(4)),
+    When(priority='high', then=Value(3)),
+    When(priority='medium', then=Value(2)),
+    When(priority='low', then=Value(1)),
+    default=Value(0),
+    output_field=IntegerField()
+)
+
+# Columns GlobalTaskListView reads for subtasks
+TASK_CHILD_FIELDS = (
+    'id', 'title', 'description', 'status', 'priority', 'level', 'path', 'parent_id',
+    'start_date', 'end_date', 'normal_flag', 'is_overdue', 'created_at', 'updated_at',
+    'project_id', 'assignee_id', 'assignee__username', 'assignee__avatar',
+    'created_by_id', 'created_by__username',
+    'subtask_count_ann', 'completed_subtask_count_ann',
+)
+
+# Display labels for rows read without model instances
+STATUS_DISPLAY = dict(TaskStatus.choices)
+PRIORITY_DISPLAY = dict(TaskPriority.choices)
+
+
+@lru_cache(maxsize=8)
+def _default_week_range(today):
+    """Get the ISO dates of the Monday and Sunday of today's week."""
+    week_start = today - timedelta(days=today.weekday())
+    return week_start.isoformat(), (week_start + timedelta(days=6)).isoformat()
 
 
 class BaseVisualizationView(generics.GenericAPIView):
@@ -37,6 +112,128 @@ class BaseVisualizationView(generics.GenericAPIView):
             return request.build_absolute_uri(avatar)
         return avatar
 
+    def _get_cache_key(self, name, project_id, viewer):
+        """Build a versioned cache key for a project visualization.
+
+        Args:
+            name: Visualization name
+            project_id: Project ID
+            viewer: 'admin', or the user ID when the data is filtered per user
+
+        Returns:
+            Key that changes with the project's tasks, any project update,
+            any username or avatar change, the day, the host (avatar URLs)
+            and the query string
+        """
+        params = '{}|{}|{}'.format(
+            self.request.get_host(),
+            timezone.now().date().isoformat(),
+            self.request.META.get('QUERY_STRING', '')
+        )
+        return 'visualization:{}:{}:{}:{}:{}:{}:{}'.format(
+            name, project_id, viewer,
+            *get_versions(
+                project_tasks_version_key(project_id), PROJECTS_VERSION_KEY, USERS_VERSION_KEY
+            ),
+            hashlib.md5(params.encode()).hexdigest()
+        )
+
+    def _get_allowed_project_ids(self, user):
+        """Get IDs of the user's team projects and projects they are a member of.
+
+        Filtering tasks by these IDs avoids joining project members into
+        the task query. The result is cached on the request and in the
+        cache until projects or the user's memberships change.
+
+        Args:
+            user: Current user
+
+        Returns:
+            Set of project IDs
+        """
+        request = self.request
+        if not hasattr(request, '_allowed_project_ids'):
+            request._allowed_project_ids = get_or_build(
+                'allowed_projects:{}:{}:{}:{}'.format(
+                    user.id, user.team_id,
+                    *get_versions(PROJECTS_VERSION_KEY, project_members_version_key(user.id))
+                ),
+                lambda: set(Project.objects.filter(
+                    Q(team_id=user.team_id) | Q(members=user)
+                ).values_list('id', flat=True)),
+                ALLOWED_PROJECTS_CACHE_TIMEOUT
+            )
+        return request._allowed_project_ids
+
+    def _get_assignee_data(self, request, assignee, **extra):
+        """Serialize a task assignee.
+
+        Args:
+            request: HTTP request object
+            assignee: Assignee user or None
+            **extra: Additional keys to include
+
+        Returns:
+            Dict with id, username and avatar URL, or None if unassigned
+        """
+        if assignee is None:
+            return None
+        return {
+            'id': assignee.id,
+            'username': assignee.username,
+            'avatar': self._get_full_avatar_url(request, assignee.avatar),
+            **extra
+        }
+
+    def _get_creator_data(self, creator):
+        """Serialize a task creator.
+
+        Args:
+            creator: Creator user or None
+
+        Returns:
+            Dict with id and username, or None if unknown
+        """
+        if creator is None:
+            return None
+        return {'id': creator.id, 'username': creator.username}
+
+    def _get_project_data(self, project_stubs, project):
+        """Serialize a task's project, sharing one dict per project.
+
+        Args:
+            project_stubs: Project ID -> serialized project, updated in place
+            project: Task's project
+
+        Returns:
+            Dict with id and title
+        """
+        data = project_stubs.get(project.id)
+        if data is None:
+            data = project_stubs[project.id] = {'id': project.id, 'title': project.title}
+        return data
+
+    def _add_to_days(self, days, payload, start, end, first_day, last_day):
+        """Add a task to each day it spans within the requested month.
+
+        Every day shares the same payload dict.
+
+        Args:
+            days: defaultdict of day key -> task payloads, updated in place
+            payload: Task data to add
+            start: Task start datetime
+            end: Task end datetime
+            first_day: First date of the month
+            last_day: Last date of the month
+        """
+        # Offsets (in days, keeping the time of day) that fall in the month
+        # and do not pass the end
+        start_day = start.date()
+        first = max((first_day - start_day).days, 0)
+        last = min((end - start).days, (last_day - start_day).days)
+        for offset in range(first, last + 1):
+            days[(start + timedelta(days=offset)).isoformat()].append(payload)
+
 
 class GanttDataView(BaseVisualizationView):
     """Get Gantt chart data for a project."""
@@ -44,13 +241,32 @@ class GanttDataView(BaseVisualizationView):
     
     def get(self, request, project_id, *args, **kwargs):
         """Get Gantt data."""
+        user = request.user
+        is_admin = is_privileged(request)
+        
+        # Admins all see the same chart; members only their own tasks
+        viewer = 'admin' if is_admin else user.id
+        data = get_or_build(
+            self._get_cache_key('gantt', project_id, viewer),
+            lambda: self._get_data(request, project_id),
+            VISUALIZATION_CACHE_TIMEOUT
+        )
+        
+        return orjson_response({
+            'code': 200,
+            'message': 'success',
+            'data': data
+        })
+    
+    def _get_data(self, request, project_id):
+        """Build Gantt data."""
         try:
-            project = Project.objects.get(id=project_id)
+            project = Project.objects.only('id').get(id=project_id)
         except Project.DoesNotExist:
             raise ResourceNotFound('项目不存在')
         
         user = request.user
-        is_admin = user.is_super_admin or user.is_team_admin
+        is_admin = is_privileged(request)
         
         # Get date range
         start_date = request.query_params.get('start_date')
@@ -76,53 +292,57 @@ class GanttDataView(BaseVisualizationView):
         
         # Get default date range if not specified
         if not start_date or not end_date:
-            today = timezone.now().date()
-            week_start = today - timedelta(days=today.weekday())
-            week_end = week_start + timedelta(days=6)
-            start_date = week_start.isoformat()
-            end_date = week_end.isoformat()
+            start_date, end_date = _default_week_range(timezone.now().date())
         
         # Build task tree
         tasks_data = []
-        member_colors = {}
-        color_palette = ['#0D9488', '#0891B2', '#10B981', '#F59E0B', '#F43F5E', '#8B5CF6']
+        colors = cycle(COLOR_PALETTE)
+        member_colors = defaultdict(lambda: next(colors))
+        member_names = {}
         
-        for task in queryset.select_related('assignee'):
+        queryset = queryset.select_related('assignee').only(
+            'id', 'title', 'start_date', 'end_date', 'status', 'level', *ASSIGNEE_FIELDS
+        )
+        if not is_admin:
+            # The member's own subtasks, fetched for all main tasks in one query
+            queryset = queryset.prefetch_related(Prefetch(
+                'children',
+                queryset=Task.objects.filter(assignee=user).only(
+                    'id', 'title', 'start_date', 'end_date', 'status', 'level', 'parent'
+                ),
+                to_attr='user_children'
+            ))
+        
+        for task in queryset:
             # Assign color to member
-            if task.assignee_id and task.assignee_id not in member_colors:
-                member_colors[task.assignee_id] = color_palette[len(member_colors) % len(color_palette)]
+            color = None
+            if task.assignee_id:
+                color = member_colors[task.assignee_id]
+                member_names[task.assignee_id] = task.assignee.username
             
             task_data = {
                 'id': task.id,
                 'title': task.title,
-                'start': task.start_date.isoformat() if task.start_date else None,
-                'end': task.end_date.isoformat() if task.end_date else None,
-                'progress': 100 if task.status == 'completed' else (
-                    50 if task.status == 'in_progress' else 0
-                ),
+                'start': task.start_date,
+                'end': task.end_date,
+                'progress': PROGRESS_MAP.get(task.status, 0),
                 'status': task.status,
-                'assignee': {
-                    'id': task.assignee.id if task.assignee else None,
-                    'username': task.assignee.username if task.assignee else None,
-                    'avatar': self._get_full_avatar_url(request, task.assignee.avatar) if task.assignee else None,
-                    'color': member_colors.get(task.assignee_id)
-                } if task.assignee else None,
+                'assignee': self._get_assignee_data(
+                    request, task.assignee, color=color
+                ),
                 'level': task.level,
                 'children': []
             }
             
             # Add children for member's own tasks
             if not is_admin and task.level == 1 and task.assignee_id == user.id:
-                children = Task.objects.filter(parent=task, assignee=user)
-                for child in children:
+                for child in task.user_children:
                     task_data['children'].append({
                         'id': child.id,
                         'title': child.title,
-                        'start': child.start_date.isoformat() if child.start_date else None,
-                        'end': child.end_date.isoformat() if child.end_date else None,
-                        'progress': 100 if child.status == 'completed' else (
-                            50 if child.status == 'in_progress' else 0
-                        ),
+                        'start': child.start_date,
+                        'end': child.end_date,
+                        'progress': PROGRESS_MAP.get(child.status, 0),
                         'status': child.status,
                         'level': child.level,
                         'children': []
@@ -130,33 +350,22 @@ class GanttDataView(BaseVisualizationView):
             
             tasks_data.append(task_data)
         
-        # Build members list
-        members = []
-        for member_id, color in member_colors.items():
-            try:
-                member = User.objects.get(id=member_id)
-                members.append({
-                    'id': member.id,
-                    'username': member.username,
-                    'color': color
-                })
-            except User.DoesNotExist:
-                pass
+        # Build members list from the assignees loaded with the tasks
+        members = [
+            {'id': member_id, 'username': member_names[member_id], 'color': color}
+            for member_id, color in member_colors.items()
+        ]
         
-        return Response({
-            'code': 200,
-            'message': 'success',
-            'data': {
-                'project_id': project.id,
-                'view_mode': view_mode,
-                'date_range': {
-                    'start': start_date,
-                    'end': end_date
-                },
-                'tasks': tasks_data,
-                'members': members
-            }
-        })
+        return {
+            'project_id': project.id,
+            'view_mode': view_mode,
+            'date_range': {
+                'start': start_date,
+                'end': end_date
+            },
+            'tasks': tasks_data,
+            'members': members
+        }
 
 
 class KanbanDataView(BaseVisualizationView):
@@ -165,13 +374,33 @@ class KanbanDataView(BaseVisualizationView):
     
     def get(self, request, project_id, *args, **kwargs):
         """Get Kanban data."""
+        user = request.user
+        is_admin = is_privileged(request)
+        
+        # Admins share the board unless filtering to their own tasks
+        assignee = request.query_params.get('assignee', 'all')
+        viewer = 'admin' if is_admin and assignee != 'me' else user.id
+        data = get_or_build(
+            self._get_cache_key('kanban', project_id, viewer),
+            lambda: self._get_data(request, project_id),
+            VISUALIZATION_CACHE_TIMEOUT
+        )
+        
+        return orjson_response({
+            'code': 200,
+            'message': 'success',
+            'data': data
+        })
+    
+    def _get_data(self, request, project_id):
+        """Build Kanban data."""
         try:
-            project = Project.objects.get(id=project_id)
+            project = Project.objects.only('id').get(id=project_id)
         except Project.DoesNotExist:
             raise ResourceNotFound('项目不存在')
         
         user = request.user
-        is_admin = user.is_super_admin or user.is_team_admin
+        is_admin = is_privileged(request)
         
         # Filter by assignee
         assignee = request.query_params.get('assignee', 'all')
@@ -193,33 +422,44 @@ class KanbanDataView(BaseVisualizationView):
             {'id': 'completed', 'title': '已完成', 'color': '#10B981', 'tasks': []},
         ]
         
-        column_map = {col['id']: col for col in columns}
+        column_tasks = {col['id']: col['tasks'] for col in columns}
         
-        for task in queryset.select_related('assignee'):
-            task_data = {
+        # Counts only - group in the database instead of loading the tasks
+        if request.query_params.get('detail') == 'false':
+            counts = dict(
+                queryset.order_by().values_list('status').annotate(count=Count('id'))
+            )
+            for col in columns:
+                col['count'] = counts.get(col['id'], 0)
+            return {
+                'project_id': project.id,
+                'columns': columns
+            }
+        
+        # Sort by status first so each column's tasks arrive together
+        queryset = queryset.order_by('status', *Task._meta.ordering)
+        for status, group in groupby(
+            queryset.select_related('assignee').only(
+                'id', 'title', 'priority', 'status', 'end_date', 'normal_flag', *ASSIGNEE_FIELDS
+            ),
+            key=attrgetter('status')
+        ):
+            bucket = column_tasks.get(status)
+            if bucket is None:
+                continue
+            bucket.extend({
                 'id': task.id,
                 'title': task.title,
                 'priority': task.priority,
-                'assignee': {
-                    'id': task.assignee.id if task.assignee else None,
-                    'username': task.assignee.username if task.assignee else None,
-                    'avatar': self._get_full_avatar_url(request, task.assignee.avatar) if task.assignee else None
-                } if task.assignee else None,
-                'end_date': task.end_date.isoformat() if task.end_date else None,
+                'assignee': self._get_assignee_data(request, task.assignee),
+                'end_date': task.end_date,
                 'normal_flag': task.normal_flag
-            }
-            
-            if task.status in column_map:
-                column_map[task.status]['tasks'].append(task_data)
+            } for task in group)
         
-        return Response({
-            'code': 200,
-            'message': 'success',
-            'data': {
-                'project_id': project.id,
-                'columns': columns
-            }
-        })
+        return {
+            'project_id': project.id,
+            'columns': columns
+        }
 
 
 class CalendarDataView(BaseVisualizationView):
@@ -229,12 +469,12 @@ class CalendarDataView(BaseVisualizationView):
     def get(self, request, project_id, *args, **kwargs):
         """Get calendar data."""
         try:
-            project = Project.objects.get(id=project_id)
+            project = Project.objects.only('id').get(id=project_id)
         except Project.DoesNotExist:
             raise ResourceNotFound('项目不存在')
         
         user = request.user
-        is_admin = user.is_super_admin or user.is_team_admin
+        is_admin = is_privileged(request)
         
         # Get year and month
         year = int(request.query_params.get('year', timezone.now().year))
@@ -257,6 +497,7 @@ class CalendarDataView(BaseVisualizationView):
         month_start = f"{year}-{month:02d}-01"
         month_end = f"{year}-{month:02d}-{last_day}"
         
+        # Every branch needs a non-null date, so undated tasks never load
         queryset = queryset.filter(
             Q(start_date__lte=month_end, end_date__gte=month_start) |
             Q(start_date__isnull=True, end_date__gte=month_start) |
@@ -264,48 +505,35 @@ class CalendarDataView(BaseVisualizationView):
         )
         
         # Group by date
-        days = {}
-        for task in queryset.select_related('assignee'):
+        days = defaultdict(list)
+        for task in queryset.select_related('assignee').only(
+            'id', 'title', 'status', 'priority', 'start_date', 'end_date', *ASSIGNEE_FIELDS
+        ):
             # Get task dates
             start = task.start_date
             end = task.end_date
             
-            if not start and not end:
-                continue
-            
             if not start:
                 start = end
             if not end:
                 end = start
             
-            # Add task to each day in range
-            current = start
-            while current <= end:
-                date_str = current.isoformat()
-                if date_str not in days:
-                    days[date_str] = []
-                
-                days[date_str].append({
-                    'id': task.id,
-                    'title': task.title,
-                    'status': task.status,
-                    'priority': task.priority,
-                    'assignee': {
-                        'id': task.assignee.id if task.assignee else None,
-                        'username': task.assignee.username if task.assignee else None,
-                        'avatar': self._get_full_avatar_url(request, task.assignee.avatar) if task.assignee else None
-                    } if task.assignee else None
-                })
-                
-                current += timedelta(days=1)
+            # Add task to each day of the month in range
+            self._add_to_days(days, {
+                'id': task.id,
+                'title': task.title,
+                'status': task.status,
+                'priority': task.priority,
+                'assignee': self._get_assignee_data(request, task.assignee)
+            }, start, end, date(year, month, 1), date(year, month, last_day))
         
         # Format response
         days_list = [
-            {'date': date, 'tasks': tasks}
-            for date, tasks in sorted(days.items())
+            {'date': day, 'tasks': tasks}
+            for day, tasks in sorted(days.items())
         ]
         
-        return Response({
+        return orjson_response({
             'code': 200,
             'message': 'success',
             'data': {
@@ -328,7 +556,7 @@ class GlobalKanbanView(BaseVisualizationView):
             current_user_id: Current user ID for sorting (own tasks first)
         """
         user = request.user
-        is_admin = user.is_super_admin or user.is_team_admin
+        is_admin = is_privileged(request)
         
         # Get current_user_id from query params for sorting
         current_user_id = request.query_params.get('current_user_id')
@@ -351,20 +579,7 @@ class GlobalKanbanView(BaseVisualizationView):
             queryset = queryset.filter(project_id=project_id)
         else:
             # Filter by user's projects
-            queryset = queryset.filter(
-                Q(project__team=user.team) |
-                Q(project__members=user)
-            ).distinct()  # 去重，避免同一任务被重复匹配
-        
-        # Priority mapping for sorting (higher number = higher priority)
-        priority_order = Case(
-            When(priority='urgent', then=Value(4)),
-            When(priority='high', then=Value(3)),
-            When(priority='medium', then=Value(2)),
-            When(priority='low', then=Value(1)),
-            default=Value(0),
-            output_field=IntegerField()
-        )
+            queryset = queryset.filter(project_id__in=self._get_allowed_project_ids(user))
         
         # Check if task belongs to current user
         is_my_task = Case(
@@ -373,14 +588,14 @@ class GlobalKanbanView(BaseVisualizationView):
             output_field=IntegerField()
         )
         
-        # Apply sorting:
+        # Apply sorting (status first so each column's tasks arrive together):
         # 1. First: is_my_task desc (own tasks first)
         # 2. Second: priority desc (urgent > high > medium > low)
         # 3. Third: created_at desc (newest first)
         queryset = queryset.annotate(
             is_my_task=is_my_task,
-            priority_value=priority_order
-        ).order_by('-is_my_task', '-priority_value', '-created_at')
+            priority_value=PRIORITY_ORDER
+        ).order_by('status', '-is_my_task', '-priority_value', '-created_at')
         
         # Group by status
         columns = [
@@ -390,36 +605,33 @@ class GlobalKanbanView(BaseVisualizationView):
             {'id': 'completed', 'title': '已完成', 'color': '#10B981', 'tasks': []},
         ]
         
-        column_map = {col['id']: col for col in columns}
-        
-        for task in queryset.select_related('assignee', 'project', 'created_by'):
-            task_data = {
+        column_tasks = {col['id']: col['tasks'] for col in columns}
+        project_stubs = {}
+        
+        for status, group in groupby(
+            queryset.select_related('assignee', 'project', 'created_by').only(
+                'id', 'title', 'description', 'priority', 'status', 'end_date', 'normal_flag',
+                'created_at', 'created_by__username', *ASSIGNEE_FIELDS, *PROJECT_FIELDS
+            ),
+            key=attrgetter('status')
+        ):
+            bucket = column_tasks.get(status)
+            if bucket is None:
+                continue
+            bucket.extend({
                 'id': task.id,
                 'title': task.title,
                 'description': task.description,
                 'priority': task.priority,
-                'assignee': {
-                    'id': task.assignee.id if task.assignee else None,
-                    'username': task.assignee.username if task.assignee else None,
-                    'avatar': self._get_full_avatar_url(request, task.assignee.avatar) if task.assignee else None
-                } if task.assignee else None,
-                'created_by': {
-                    'id': task.created_by.id if task.created_by else None,
-                    'username': task.created_by.username if task.created_by else None
-                } if task.created_by else None,
-                'project': {
-                    'id': task.project.id,
-                    'title': task.project.title
-                },
-                'end_date': task.end_date.isoformat() if task.end_date else None,
+                'assignee': self._get_assignee_data(request, task.assignee),
+                'created_by': self._get_creator_data(task.created_by),
+                'project': self._get_project_data(project_stubs, task.project),
+                'end_date': task.end_date,
                 'normal_flag': task.normal_flag,
-                'created_at': task.created_at.isoformat() if task.created_at else None
-            }
-            
-            if task.status in column_map:
-                column_map[task.status]['tasks'].append(task_data)
+                'created_at': task.created_at
+            } for task in group)
         
-        return Response({
+        return orjson_response({
             'code': 200,
             'message': 'success',
             'data': {
@@ -435,7 +647,7 @@ class GlobalGanttView(BaseVisualizationView):
     def get(self, request, *args, **kwargs):
         """Get global Gantt data."""
         user = request.user
-        is_admin = user.is_super_admin or user.is_team_admin
+        is_admin = is_privileged(request)
         
         # Get date range
         start_date = request.query_params.get('start_date')
@@ -452,10 +664,7 @@ class GlobalGanttView(BaseVisualizationView):
         if project_id:
             queryset = queryset.filter(project_id=project_id)
         else:
-            queryset = queryset.filter(
-                Q(project__team=user.team) |
-                Q(project__members=user)
-            ).distinct()  # 去重，避免同一任务被重复匹配
+            queryset = queryset.filter(project_id__in=self._get_allowed_project_ids(user))
         
         # Apply date filter
         if start_date:
@@ -465,58 +674,11 @@ class GlobalGanttView(BaseVisualizationView):
         
         # Get default date range
         if not start_date or not end_date:
-            today = timezone.now().date()
-            week_start = today - timedelta(days=today.weekday())
-            week_end = week_start + timedelta(days=6)
-            start_date = week_start.isoformat()
-            end_date = week_end.isoformat()
-        
-        # Build task list
-        tasks_data = []
-        project_colors = {}
-        color_palette = ['#0D9488', '#0891B2', '#10B981', '#F59E0B', '#F43F5E', '#8B5CF6']
+            start_date, end_date = _default_week_range(timezone.now().date())
         
-        for task in queryset.select_related('assignee', 'project'):
-            # Assign color to project
-            if task.project_id not in project_colors:
-                project_colors[task.project_id] = color_palette[len(project_colors) % len(color_palette)]
-            
-            tasks_data.append({
-                'id': task.id,
-                'title': task.title,
-                'start': task.start_date.isoformat() if task.start_date else None,
-                'end': task.end_date.isoformat() if task.end_date else None,
-                'progress': 100 if task.status == 'completed' else (
-                    50 if task.status == 'in_progress' else 0
-                ),
-                'status': task.status,
-                'assignee': {
-                    'id': task.assignee.id if task.assignee else None,
-                    'username': task.assignee.username if task.assignee else None,
-                    'avatar': self._get_full_avatar_url(request, task.assignee.avatar) if task.assignee else None
-                } if task.assignee else None,
-                'project': {
-                    'id': task.project.id,
-                    'title': task.project.title
-                },
-                'level': task.level,
-                'children': []
-            })
-        
-        # Build projects list
-        projects = []
-        for project_id, color in project_colors.items():
-            try:
-                project = Project.objects.get(id=project_id)
-                projects.append({
-                    'id': project.id,
-                    'title': project.title,
-                    'color': color
-                })
-            except Project.DoesNotExist:
-                pass
+        tasks, projects = self._get_tasks_and_projects(request, queryset)
         
-        return Response({
+        return orjson_response({
             'code': 200,
             'message': 'success',
             'data': {
@@ -525,10 +687,54 @@ class GlobalGanttView(BaseVisualizationView):
                     'start': start_date,
                     'end': end_date
                 },
-                'tasks': tasks_data,
+                'tasks': tasks,
                 'projects': projects
             }
         })
+    
+    def _get_tasks_and_projects(self, request, queryset):
+        """Build Gantt task data and the legend of the projects they belong to.
+        
+        Args:
+            request: HTTP request object
+            queryset: Main tasks to serialize
+        
+        Returns:
+            Tuple of (task data list, project data list in order of first appearance)
+        """
+        colors = cycle(COLOR_PALETTE)
+        tasks = []
+        projects = []
+        project_ids = set()
+        project_stubs = {}
+        
+        for task in queryset.select_related('assignee', 'project').only(
+            'id', 'title', 'start_date', 'end_date', 'status', 'level',
+            *ASSIGNEE_FIELDS, *PROJECT_FIELDS
+        ).iterator(chunk_size=500):
+            # Assign colors to projects in order of first appearance
+            if task.project_id not in project_ids:
+                project_ids.add(task.project_id)
+                projects.append({
+                    'id': task.project_id,
+                    'title': task.project.title,
+                    'color': next(colors)
+                })
+            
+            tasks.append({
+                'id': task.id,
+                'title': task.title,
+                'start': task.start_date,
+                'end': task.end_date,
+                'progress': PROGRESS_MAP.get(task.status, 0),
+                'status': task.status,
+                'assignee': self._get_assignee_data(request, task.assignee),
+                'project': self._get_project_data(project_stubs, task.project),
+                'level': task.level,
+                'children': []
+            })
+        
+        return tasks, projects
 
 
 class GlobalCalendarView(BaseVisualizationView):
@@ -538,7 +744,7 @@ class GlobalCalendarView(BaseVisualizationView):
     def get(self, request, *args, **kwargs):
         """Get global calendar data."""
         user = request.user
-        is_admin = user.is_super_admin or user.is_team_admin
+        is_admin = is_privileged(request)
         
         # Get year and month
         year = int(request.query_params.get('year', timezone.now().year))
@@ -554,10 +760,7 @@ class GlobalCalendarView(BaseVisualizationView):
         if project_id:
             queryset = queryset.filter(project_id=project_id)
         else:
-            queryset = queryset.filter(
-                Q(project__team=user.team) |
-                Q(project__members=user)
-            ).distinct()  # 去重，避免同一任务被重复匹配
+            queryset = queryset.filter(project_id__in=self._get_allowed_project_ids(user))
         
         # Filter by month
         from calendar import monthrange
@@ -565,6 +768,7 @@ class GlobalCalendarView(BaseVisualizationView):
         month_start = f"{year}-{month:02d}-01"
         month_end = f"{year}-{month:02d}-{last_day}"
         
+        # Every branch needs a non-null date, so undated tasks never load
         queryset = queryset.filter(
             Q(start_date__lte=month_end, end_date__gte=month_start) |
             Q(start_date__isnull=True, end_date__gte=month_start) |
@@ -572,50 +776,36 @@ class GlobalCalendarView(BaseVisualizationView):
         )
         
         # Group by date
-        days = {}
-        for task in queryset.select_related('assignee', 'project'):
+        days = defaultdict(list)
+        project_stubs = {}
+        for task in queryset.select_related('assignee', 'project').only(
+            'id', 'title', 'status', 'priority', 'start_date', 'end_date',
+            *ASSIGNEE_FIELDS, *PROJECT_FIELDS
+        ):
             start = task.start_date
             end = task.end_date
             
-            if not start and not end:
-                continue
-            
             if not start:
                 start = end
             if not end:
                 end = start
             
-            current = start
-            while current <= end:
-                date_str = current.isoformat()
-                if date_str not in days:
-                    days[date_str] = []
-                
-                days[date_str].append({
-                    'id': task.id,
-                    'title': task.title,
-                    'status': task.status,
-                    'priority': task.priority,
-                    'assignee': {
-                        'id': task.assignee.id if task.assignee else None,
-                        'username': task.assignee.username if task.assignee else None,
-                        'avatar': self._get_full_avatar_url(request, task.assignee.avatar) if task.assignee else None
-                    } if task.assignee else None,
-                    'project': {
-                        'id': task.project.id,
-                        'title': task.project.title
-                    }
-                })
-                
-                current += timedelta(days=1)
+            self._add_to_days(days, {
+                'id': task.id,
+                'title': task.title,
+                'status': task.status,
+                'priority': task.priority,
+                'assignee': self._get_assignee_data(request, task.assignee),
+                'project': self._get_project_data(project_stubs, task.project)
+            }, start, end, date(year, month, 1), date(year, month, last_day))
         
         # Format response
         days_list = [
-            {'date': date, 'tasks': tasks}
-            for date, tasks in sorted(days.items())
+            {'date': day, 'tasks': tasks}
+            for day, tasks in sorted(days.items())
         ]
         
-        return Response({
+        return orjson_response({
             'code': 200,
             'message': 'success',
             'data': {
@@ -633,7 +823,7 @@ class GlobalTaskListView(BaseVisualizationView):
     def get(self, request, *args, **kwargs):
         """Get global task list with tree structure."""
         user = request.user
-        is_admin = user.is_super_admin or user.is_team_admin
+        is_admin = is_privileged(request)
         
         # Filters
         project_id = request.query_params.get('project_id')
@@ -653,18 +843,17 @@ class GlobalTaskListView(BaseVisualizationView):
             # 成员需要看到：
             # 1. 分配给自己的主任务
             # 2. 包含自己子任务的主任务（即使主任务不是自己的）
+            # 用 EXISTS 判断子任务，避免 JOIN 后 DISTINCT
             queryset = Task.objects.filter(
-                Q(level=1, assignee=user, project__is_archived=False) |
-                Q(level=1, children__assignee=user, project__is_archived=False)
-            ).distinct()
+                Q(assignee=user) |
+                Exists(Task.objects.filter(parent=OuterRef('pk'), assignee=user)),
+                level=1, project__is_archived=False
+            )
         
         if project_id:
             queryset = queryset.filter(project_id=project_id)
         else:
-            queryset = queryset.filter(
-                Q(project__team=user.team) |
-                Q(project__members=user)
-            ).distinct()
+            queryset = queryset.filter(project_id__in=self._get_allowed_project_ids(user))
         
         # Apply filters
         if status:
@@ -680,187 +869,187 @@ class GlobalTaskListView(BaseVisualizationView):
             queryset = queryset.filter(assignee_id=assignee)
         
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search)
-            )
+            queryset = search_filter(queryset, ('title', 'description'), search)
         
         # Apply sorting
         order_prefix = '-' if sort_order == 'desc' else ''
         queryset = queryset.order_by(f"{order_prefix}{sort_by}")
         
-        # Build tree data
+        # Return at most GLOBAL_TASK_LIST_LIMIT main tasks, read as plain rows
+        tasks = list(
+            self._get_list_rows(queryset)[:GLOBAL_TASK_LIST_LIMIT + 1]
+        )
+        truncated = len(tasks) > GLOBAL_TASK_LIST_LIMIT
+        del tasks[GLOBAL_TASK_LIST_LIMIT:]
+        
         if view_type == 'flat':
             # Flat view - 返回扁平列表，不包含子任务嵌套
-            data = self._build_flat_data(queryset, user, is_admin)
-            return Response({
-                'code': 200,
-                'message': 'success',
-                'data': {
-                    'items': data,
-                    'view_type': 'flat'
-                }
-            })
-        
-        # Tree view - 返回树形结构，包含嵌套子任务（默认）
-        data = self._build_tree_data(queryset, user, is_admin)
+            items = self._build_flat_data(tasks)
+        else:
+            # Tree view - 返回树形结构，包含嵌套子任务（默认）
+            view_type = 'tree'
+            items = self._build_tree_data(tasks, user, is_admin)
         
-        return Response({
+        return orjson_response({
             'code': 200,
             'message': 'success',
             'data': {
-                'items': data,
-                'view_type': 'tree'
+                'items': items,
+                'view_type': view_type,
+                'truncated': truncated
             }
         })
     
-    def _build_tree_data(self, queryset, user, is_admin):
+    def _build_tree_data(self, tasks, user, is_admin):
         """Build tree structure with nested children."""
-        data = []
-        for task in queryset.select_related('assignee', 'project', 'created_by'):
-            task_data = self._get_task_detail(task, user, is_admin, include_children=True)
-            data.append(task_data)
-        return data
+        children_by_parent = self._get_children_by_parent(
+            [task['id'] for task in tasks], user, is_admin
+        )
+        return [
+            self._get_task_detail(task, children_by_parent)
+            for task in tasks
+        ]
     
-    def _build_flat_data(self, queryset, user, is_admin):
+    def _build_flat_data(self, tasks):
         """Build flat list without nested children."""
-        data = []
-        for task in queryset.select_related('assignee', 'project', 'created_by'):
-            task_data = self._get_task_detail(task, user, is_admin, include_children=False)
-            data.append(task_data)
-        return data
+        return [self._get_task_detail(task) for task in tasks]
     
-    def _get_task_detail(self, task, user, is_admin, include_children=True):
-        """Get detailed task info with permission check."""
-        # Check if user can view full details
-        can_view_full = (
-            is_admin or
-            task.assignee_id == user.id or
-            task.children.filter(assignee=user).exists()  # 有子任务分配给用户
-        )
-        
-        # Base fields (always visible)
+    def _get_row_assignee_data(self, request, row):
+        """Serialize the assignee of a task row read with values()."""
+        if row['assignee_id'] is None:
+            return None
+        return {
+            'id': row['assignee_id'],
+            'username': row['assignee__username'],
+            'avatar': self._get_full_avatar_url(request, row['assignee__avatar'])
+        }
+    
+    def _get_row_creator_data(self, row):
+        """Serialize the creator of a task row read with values()."""
+        if row['created_by_id'] is None:
+            return None
+        return {'id': row['created_by_id'], 'username': row['created_by__username']}
+    
+    def _get_list_rows(self, queryset):
+        """Read main tasks as dicts with their subtask counts.
+
+        Args:
+            queryset: Main task queryset
+
+        Returns:
+            Values queryset of TASK_LIST_FIELDS
+        """
+        return annotate_subtask_counts(queryset).values(*TASK_LIST_FIELDS)
+    
+    def _get_task_detail(self, row, children_by_parent=None):
+        """Get detailed task info.
+
+        Every listed main task is viewable in full: members only get tasks
+        assigned to them or holding one of their subtasks, which the member
+        filter in get() already checks. Children are only included when
+        children_by_parent is given.
+        """
         task_data = {
-            'id': task.id,
-            'title': task.title,
+            'id': row['id'],
+            'title': row['title'],
             'project': {
-                'id': task.project.id,
-                'title': task.project.title,
-                'is_archived': task.project.is_archived
+                'id': row['project_id'],
+                'title': row['project__title'],
+                'is_archived': row['project__is_archived']
             },
-            'status': task.status,
-            'status_display': task.get_status_display(),
-            'priority': task.priority,
-            'priority_display': task.get_priority_display(),
-            'level': task.level,
-            'path': task.path,
-            'can_view': can_view_full,
+            'status': row['status'],
+            'status_display': STATUS_DISPLAY.get(row['status'], row['status']),
+            'priority': row['priority'],
+            'priority_display': PRIORITY_DISPLAY.get(row['priority'], row['priority']),
+            'level': row['level'],
+            'path': row['path'],
+            'can_view': True,
         }
         
-        if not can_view_full:
-            # 无权限时返回脱敏数据
-            task_data.update({
-                'assignee': {'id': None, 'username': '🔒 私有任务'},
-                'description': '',
-                'start_date': None,
-                'end_date': None,
-                'normal_flag': 'normal',
-                'subtask_count': 0,
-                'completed_subtask_count': 0,
-                'children': [],
-                'message': '该任务未分配给您，无权查看详情'
-            })
-            return task_data
-        
-        # Full details (authorized user)
         request = self.request
+        can_have_subtasks = row['level'] < MAX_TASK_LEVEL
         task_data.update({
-            'description': task.description,
-            'assignee': {
-                'id': task.assignee.id if task.assignee else None,
-                'username': task.assignee.username if task.assignee else None,
-                'avatar': self._get_full_avatar_url(request, task.assignee.avatar) if task.assignee else None
-            } if task.assignee else None,
-            'assignee_id': task.assignee_id,
-            'parent_id': task.parent_id,
-            'start_date': task.start_date.isoformat() if task.start_date else None,
-            'end_date': task.end_date.isoformat() if task.end_date else None,
-            'normal_flag': task.normal_flag,
-            'is_overdue': task.is_overdue,
-            'subtask_count': task.subtask_count,
-            'completed_subtask_count': task.completed_subtask_count,
-            'can_have_subtasks': task.can_have_subtasks,
-            'created_by': {
-                'id': task.created_by.id if task.created_by else None,
-                'username': task.created_by.username if task.created_by else None
-            } if task.created_by else None,
-            'created_at': task.created_at.isoformat() if task.created_at else None,
-            'updated_at': task.updated_at.isoformat() if task.updated_at else None,
+            'description': row['description'],
+            'assignee': self._get_row_assignee_data(request, row),
+            'assignee_id': row['assignee_id'],
+            'parent_id': row['parent_id'],
+            'start_date': row['start_date'],
+            'end_date': row['end_date'],
+            'normal_flag': row['normal_flag'],
+            'is_overdue': row['is_overdue'],
+            'subtask_count': row['subtask_count_ann'],
+            'completed_subtask_count': row['completed_subtask_count_ann'],
+            'can_have_subtasks': can_have_subtasks,
+            'created_by': self._get_row_creator_data(row),
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
         })
         
         # Add nested children if needed
-        if include_children and task.can_have_subtasks:
-            children = self._get_children(task, user, is_admin)
-            task_data['children'] = children
+        if children_by_parent is not None and can_have_subtasks:
+            task_data['children'] = children_by_parent[row['id']]
         else:
             task_data['children'] = []
         
         return task_data
     
-    def _get_children(self, parent_task, user, is_admin):
-        """Recursively get child tasks with permission filtering."""
-        children = []
-        
-        # Get child tasks
-        child_queryset = parent_task.children.all()
+    def _get_children_by_parent(self, parent_ids, user, is_admin):
+        """Load the subtask trees under parent_ids, one query per level.
+
+        Args:
+            parent_ids: IDs of the main tasks
+            user: Current user
+            is_admin: Whether the user sees every subtask
+
+        Returns:
+            Dict of parent ID -> list of child task data, each holding its
+            own children list from the same dict
+        """
+        children_by_parent = defaultdict(list)
+        request = self.request
         
-        # For non-admin members, only show their own subtasks
-        if not is_admin:
-            child_queryset = child_queryset.filter(assignee=user)
-        
-        for child in child_queryset.select_related('assignee', 'created_by'):
-            request = self.request
-            child_data = {
-                'id': child.id,
-                'title': child.title,
-                'description': child.description,
-                'project_id': child.project_id,
-                'status': child.status,
-                'status_display': child.get_status_display(),
-                'priority': child.priority,
-                'priority_display': child.get_priority_display(),
-                'level': child.level,
-                'parent_id': child.parent_id,
-                'path': child.path,
-                'assignee': {
-                    'id': child.assignee.id if child.assignee else None,
-                    'username': child.assignee.username if child.assignee else None,
-                    'avatar': self._get_full_avatar_url(request, child.assignee.avatar) if child.assignee else None
-                } if child.assignee else None,
-                'assignee_id': child.assignee_id,
-                'start_date': child.start_date.isoformat() if child.start_date else None,
-                'end_date': child.end_date.isoformat() if child.end_date else None,
-                'normal_flag': child.normal_flag,
-                'is_overdue': child.is_overdue,
-                'subtask_count': child.subtask_count,
-                'completed_subtask_count': child.completed_subtask_count,
-                'can_have_subtasks': child.can_have_subtasks,
-                'can_view': True,
-                'created_by': {
-                    'id': child.created_by.id if child.created_by else None,
-                    'username': child.created_by.username if child.created_by else None
-                } if child.created_by else None,
-                'created_at': child.created_at.isoformat() if child.created_at else None,
-                'updated_at': child.updated_at.isoformat() if child.updated_at else None,
-            }
+        while parent_ids:
+            child_queryset = Task.objects.filter(parent_id__in=parent_ids)
             
-            # Recursively get grandchildren
-            if child.can_have_subtasks:
-                grandchildren = self._get_children(child, user, is_admin)
-                child_data['children'] = grandchildren
-            else:
-                child_data['children'] = []
+            # For non-admin members, only show their own subtasks
+            if not is_admin:
+                child_queryset = child_queryset.filter(assignee=user)
             
-            children.append(child_data)
+            parent_ids = []
+            for row in annotate_subtask_counts(child_queryset).values(
+                *TASK_CHILD_FIELDS
+            ):
+                can_have_subtasks = row['level'] < MAX_TASK_LEVEL
+                children_by_parent[row['parent_id']].append({
+                    'id': row['id'],
+                    'title': row['title'],
+                    'description': row['description'],
+                    'project_id': row['project_id'],
+                    'status': row['status'],
+                    'status_display': STATUS_DISPLAY.get(row['status'], row['status']),
+                    'priority': row['priority'],
+                    'priority_display': PRIORITY_DISPLAY.get(row['priority'], row['priority']),
+                    'level': row['level'],
+                    'parent_id': row['parent_id'],
+                    'path': row['path'],
+                    'assignee': self._get_row_assignee_data(request, row),
+                    'assignee_id': row['assignee_id'],
+                    'start_date': row['start_date'],
+                    'end_date': row['end_date'],
+                    'normal_flag': row['normal_flag'],
+                    'is_overdue': row['is_overdue'],
+                    'subtask_count': row['subtask_count_ann'],
+                    'completed_subtask_count': row['completed_subtask_count_ann'],
+                    'can_have_subtasks': can_have_subtasks,
+                    'can_view': True,
+                    'created_by': self._get_row_creator_data(row),
+                    'created_at': row['created_at'],
+                    'updated_at': row['updated_at'],
+                    # Filled in when the next level loads
+                    'children': children_by_parent[row['id']] if can_have_subtasks else []
+                })
+                
+                if can_have_subtasks:
+                    parent_ids.append(row['id'])
         
-        return children
+        return children_by_parent
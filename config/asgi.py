@@ -4,6 +4,7 @@ ASGI config for TeamSync project.
 import os
 
 from django.core.asgi import get_asgi_application
+from django.urls import get_resolver
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 
@@ -12,6 +13,10 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 # Import routing after Django setup
 django_asgi_app = get_asgi_application()
 
+# Build the URL resolver (URLconf imports, compiled patterns, reverse lookup)
+# now instead of on the first request
+get_resolver().reverse_dict
+
 from apps.notifications import routing
 
 application = ProtocolTypeRouter({
@@ -0,0 +1,106 @@
+"""
+Cache helpers for TeamSync.
+
+Cached responses embed version numbers in their keys; writes bump the
+versions they affect instead of deleting keys, and stale entries expire.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from functools import partial
+import threading
+import weakref
+
+
+# Per-key locks for get_or_build(); entries go away once no thread holds them
+_build_locks = weakref.WeakValueDictionary()
+_build_locks_guard = threading.Lock()
+
+
+# Bumped on any project save (rename, archive, ...)
+PROJECTS_VERSION_KEY = 'version:projects'
+
+# Bumped on any user save other than login bookkeeping and password changes
+USERS_VERSION_KEY = 'version:users'
+
+# Bumped whenever anyone joins or leaves a project
+MEMBERSHIPS_VERSION_KEY = 'version:memberships'
+
+
+def assignee_version_key(user_id):
+    """Version key bumped whenever a task assigned to user_id changes."""
+    return f'version:tasks:assignee:{user_id}'
+
+
+def project_tasks_version_key(project_id):
+    """Version key bumped whenever a task in project_id changes."""
+    return f'version:tasks:project:{project_id}'
+
+
+def project_members_version_key(user_id):
+    """Version key bumped whenever user_id joins or leaves a project."""
+    return f'version:project_members:user:{user_id}'
+
+
+def get_versions(*keys):
+    """Get the current version of each key (1 if never bumped).
+
+    Args:
+        *keys: Version keys
+
+    Returns:
+        List of version numbers in the order of keys
+    """
+    found = cache.get_many(keys)
+    return [found.get(key, 1) for key in keys]
+
+
+def bump_versions(*keys):
+    """Increment the given version keys, invalidating entries built on them."""
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Never bumped before; get_versions() reported it as 1
+            cache.set(key, 2, None)
+
+
+def bump_versions_on_commit(*keys):
+    """Bump the given version keys once the current transaction commits.
+    
+    Bumping inside the transaction would let a concurrent reader rebuild
+    and cache the pre-commit rows under the new version.
+    """
+    transaction.on_commit(partial(bump_versions, *keys))
+
+
+def get_or_build(key, build, timeout):
+    """Get a cached value, building it once for concurrent misses.
+
+    Requests in this process that miss the same key at the same time wait
+    for the first one to build and store the value instead of all running
+    the same queries.
+
+    Args:
+        key: Cache key
+        build: Callable returning the value to cache (not None)
+        timeout: Cache timeout in seconds
+
+    Returns:
+        The cached or newly built value
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+    
+    with _build_locks_guard:
+        lock = _build_locks.get(key)
+        if lock is None:
+            lock = _build_locks[key] = threading.Lock()
+    
+    with lock:
+        # Another request may have built it while we waited
+        value = cache.get(key)
+        if value is None:
+            value = build()
+            cache.set(key, value, timeout)
+    return value
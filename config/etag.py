@@ -0,0 +1,28 @@
+"""
+ETag helpers for TeamSync.
+"""
+import hashlib
+
+from django.utils.http import parse_etags, quote_etag
+
+
+def make_etag(*parts):
+    """Build a quoted ETag from the given version parts.
+
+    Args:
+        *parts: Values identifying the response version (counts, timestamps, ...)
+
+    Returns:
+        Quoted ETag string
+    """
+    raw = ':'.join(str(part) for part in parts)
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def etag_matches(request, etag):
+    """Check if the request's If-None-Match header matches etag."""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return etag in etags or '*' in etags
@@ -42,3 +42,17 @@ class IsTaskAssigneeOrAdmin(permissions.BasePermission):
         if request.user.is_superuser or request.user.is_team_admin:
             return True
         return obj.assignee_id == request.user.id
+
+
+def is_privileged(request):
+    """Check if request user is a super admin or team admin (cached per request)."""
+    privileged = getattr(request, '_is_privileged', None)
+    if privileged is None:
+        user = request.user
+        privileged = request._is_privileged = bool(user.is_super_admin or user.is_team_admin)
+    return privileged
+
+
+def can_access_task(request, task):
+    """Check if request user can view and edit the task."""
+    return is_privileged(request) or task.assignee_id == request.user.id
@@ -1,7 +1,9 @@
 """
 Custom renderers for TeamSync.
 """
+from django.http import HttpResponse
 from rest_framework.renderers import JSONRenderer
+import orjson
 
 
 class StandardJSONRenderer(JSONRenderer):
@@ -9,28 +11,87 @@ class StandardJSONRenderer(JSONRenderer):
     Custom JSON renderer that wraps responses in a standard format.
     """
     def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(
+            self.wrap(data, renderer_context), accepted_media_type, renderer_context
+        )
+    
+    def wrap(self, data, renderer_context=None):
+        """Wrap response data in the standard {code, message, data} format."""
         response = renderer_context['response'] if renderer_context else None
         
         # If data is already in standard format, don't wrap it again
         if isinstance(data, dict) and 'code' in data and 'message' in data:
-            return super().render(data, accepted_media_type, renderer_context)
+            return data
         
         # Wrap the data in standard format
         status_code = response.status_code if response else 200
         
         if status_code >= 400:
             # Error response
-            wrapped_data = {
+            return {
                 'code': status_code,
                 'message': data.get('detail', '请求失败') if isinstance(data, dict) else '请求失败',
                 'errors': data if isinstance(data, dict) else {}
             }
-        else:
-            # Success response
-            wrapped_data = {
-                'code': status_code,
-                'message': 'success',
-                'data': data
-            }
         
-        return super().render(wrapped_data, accepted_media_type, renderer_context)
+        # Success response
+        return {
+            'code': status_code,
+            'message': 'success',
+            'data': data
+        }
+
+
+class ORJSONRenderer(StandardJSONRenderer):
+    """
+    Standard format renderer encoding with orjson; the default renderer.
+    
+    Output matches StandardJSONRenderer: types orjson can't encode
+    natively (datetimes, decimals, lazy strings) go through DRF's encoder.
+    """
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        
+        # Indented output is only for humans; keep the stdlib path for it
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        return self.encode(self.wrap(data, renderer_context))
+    
+    def encode(self, obj):
+        """Encode obj to JSON bytes without wrapping it."""
+        ret = orjson.dumps(obj, default=self.encoder_class().default, option=self.options)
+        # Escape separators that are valid JSON but not valid JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class ISODatetimeORJSONRenderer(ORJSONRenderer):
+    """
+    ORJSONRenderer that encodes datetimes natively, exactly as
+    datetime.isoformat() would (UTC as +00:00 rather than DRF's Z).
+    """
+    options = orjson.OPT_NON_STR_KEYS
+
+
+def orjson_response(payload, status=200):
+    """Build a JSON response directly, skipping DRF's Response rendering.
+    
+    Datetimes and dates are encoded like their isoformat().
+    
+    Args:
+        payload: Response body, already in the standard format
+        status: HTTP status code
+    
+    Returns:
+        HttpResponse with the orjson-encoded body
+    """
+    return HttpResponse(
+        ISODatetimeORJSONRenderer().render(payload),
+        content_type=ISODatetimeORJSONRenderer.media_type,
+        status=status
+    )
+
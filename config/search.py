@@ -0,0 +1,75 @@
+"""
+Full-text search helpers for TeamSync.
+"""
+from django.db import connections, models
+from django.db.models import Q
+
+
+# MySQL's ngram parser splits text into tokens of this many characters
+# (ngram_token_size); shorter terms cannot be matched against the index.
+NGRAM_TOKEN_SIZE = 2
+
+
+class SearchVectorField(models.Field):
+    """Output field of SearchVector, only used to register the match lookup."""
+
+
+class SearchVector(models.Func):
+    """Column list of a FULLTEXT index, e.g. ``title, description``."""
+    template = '%(expressions)s'
+    output_field = SearchVectorField()
+
+
+@SearchVectorField.register_lookup
+class MatchAgainst(models.Lookup):
+    """MATCH (columns) AGAINST (term IN BOOLEAN MODE) lookup."""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'MATCH ({lhs}) AGAINST ({rhs} IN BOOLEAN MODE)', [*lhs_params, *rhs_params]
+
+
+# Boolean-mode operators, stripped from search terms before they are quoted
+# (a stray double quote would end the phrase early)
+BOOLEAN_OPERATORS = str.maketrans({char: ' ' for char in '"+-*~<>'})
+
+
+def _boolean_phrase(term):
+    """Build the quoted AGAINST phrase for term.
+
+    Args:
+        term: Raw search term
+
+    Returns:
+        The phrase, or None when a word of the term (once boolean-mode
+        operators are stripped) is shorter than the ngram size and so
+        cannot be matched against the index
+    """
+    words = term.translate(BOOLEAN_OPERATORS).split()
+    if not words or any(len(word) < NGRAM_TOKEN_SIZE for word in words):
+        return None
+    return '"%s"' % ' '.join(words)
+
+
+def search_filter(queryset, fields, term):
+    """Filter queryset to rows where any of fields contains term.
+
+    On MySQL the lookup goes through the ngram FULLTEXT index covering exactly
+    ``fields`` (see the migrations creating them), searching the term as a
+    phrase so it keeps substring semantics. Other backends, and terms with a
+    word shorter than the ngram size, fall back to ``icontains``.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'mysql':
+        phrase = _boolean_phrase(term)
+        if phrase is not None:
+            return queryset.alias(
+                search_vector=SearchVector(*fields)
+            ).filter(search_vector__match=phrase)
+
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f'{field}__icontains': term})
+    return queryset.filter(condition)
@@ -4,7 +4,12 @@ WSGI config for TeamSync project.
 import os
 
 from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Build the URL resolver (URLconf imports, compiled patterns, reverse lookup)
+# now instead of on the first request
+get_resolver().reverse_dict
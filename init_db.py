@@ -5,7 +5,6 @@ Creates database and runs migrations.
 """
 import os
 import sys
-import subprocess
 import pymysql
 
 # Database configuration
@@ -19,6 +18,9 @@ DB_CONFIG = {
 
 DB_NAME = 'teamsync'
 
+# MySQL warning code for "Can't create database; database exists"
+DB_EXISTS_WARNING = 1007
+
 
 def create_database():
     """Create database if not exists."""
@@ -26,13 +28,14 @@ def create_database():
         conn = pymysql.connect(**DB_CONFIG)
         cursor = conn.cursor()
         
-        # Check if database exists
-        cursor.execute(f"SHOW DATABASES LIKE '{DB_NAME}'")
-        if cursor.fetchone():
+        # Create database; MySQL raises warning 1007 if it already exists
+        cursor.execute(
+            f"CREATE DATABASE IF NOT EXISTS {DB_NAME} "
+            f"CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
+        )
+        if any(code == DB_EXISTS_WARNING for _, code, _ in conn.show_warnings()):
             print(f"Database '{DB_NAME}' already exists.")
         else:
-            # Create database
-            cursor.execute(f"CREATE DATABASE {DB_NAME} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
             print(f"Database '{DB_NAME}' created successfully.")
         
         cursor.close()
@@ -44,30 +47,26 @@ def create_database():
         return False
 
 
+def setup_django():
+    """Set up Django once so management commands run in this process."""
+    import django
+    
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+
+
 def run_migrations():
     """Run Django migrations."""
+    from django.core.management import call_command
+    
     try:
         # Make migrations
         print("\nMaking migrations...")
-        result = subprocess.run(
-            [sys.executable, 'manage.py', 'makemigrations'],
-            capture_output=True,
-            text=True
-        )
-        print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
+        call_command('makemigrations')
         
         # Run migrations
         print("\nRunning migrations...")
-        result = subprocess.run(
-            [sys.executable, 'manage.py', 'migrate'],
-            capture_output=True,
-            text=True
-        )
-        print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
+        call_command('migrate')
         
         return True
     
@@ -78,14 +77,13 @@ def run_migrations():
 
 def create_superuser():
     """Create superuser."""
+    from django.core.management import call_command
+    
     print("\nCreating superuser...")
     print("Please enter superuser details:")
     
     try:
-        result = subprocess.run(
-            [sys.executable, 'manage.py', 'createsuperuser'],
-            capture_output=False
-        )
+        call_command('createsuperuser')
         return True
     except Exception as e:
         print(f"Error creating superuser: {e}")
@@ -104,6 +102,7 @@ def main():
         sys.exit(1)
     
     # Run migrations
+    setup_django()
     if not run_migrations():
         print("\nFailed to run migrations. Exiting.")
         sys.exit(1)